@@ -0,0 +1,344 @@
+"""
+Benchmarks for the internals hot paths.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --baseline benchmark_baseline.json
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+from typing import Callable, Dict, List, Optional
+
+# SDL picks its drivers when pygame initialises, so set them before import
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# pylint: disable=wrong-import-position
+import pygame
+
+from internals.game_clock import GAME_CLOCK
+from internals.game_configs import GAME, TILE
+from internals.game_session import GameSession
+from internals.map_generator import draw_map, ChunkedMapRenderer, MapGenerator
+from internals.flow_field import FlowField
+from internals.explosions import SMOKE_OFFSETS
+from internals.bot_tank import generate_bots
+from internals.player_input import AutoPilotInput
+from internals.profiler import percentile
+from internals.sound import SOUNDS
+from internals.spatial_hash import SpatialHash
+
+BenchmarkResults = Dict[str, Dict[str, float]]
+
+BOT_COUNTS = [30, 300, 3_000]
+BULLET_COUNTS = [10, 100, 1_000]
+# regressions smaller than this (in percent of the baseline mean) are noise
+DEFAULT_THRESHOLD = 10.0
+# bots per screen-sized area of world, bigger counts get a bigger world
+DEFAULT_BOTS_PER_SCREEN = 30
+# bots asked for on a single screen for the sprite drawing scenario,
+# spawning stops at the 180 or so that fit
+CROWD_BOTS_COUNT = 200
+# explosions playing at once on a single screen
+EXPLOSIONS_COUNT = 250
+
+
+def measure(
+    run: Callable[[], None],
+    setup: Optional[Callable[[], None]] = None,
+    repeat: int = 50,
+    budget: float = 2.0,
+    warmup: int = 1,
+) -> List[float]:
+    """Time run() up to `repeat` times, stopping early when over the time budget."""
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        run()
+
+    samples: List[float] = []
+    started = time.perf_counter()
+    while len(samples) < repeat:
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+        if time.perf_counter() - started > budget:
+            break
+    return samples
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Mean, p95 and p99 of the samples in milliseconds."""
+    return {
+        "samples": len(samples),
+        "mean_ms": sum(samples) / len(samples) * 1_000,
+        "p95_ms": percentile(samples, 95) * 1_000,
+        "p99_ms": percentile(samples, 99) * 1_000,
+    }
+
+
+def use_bots_count(bots_count: int) -> None:
+    """Set the bot count, growing the world so the bots keep the default density."""
+    GAME["bots_count"] = bots_count
+    scale = max(1, math.ceil(math.sqrt(bots_count / DEFAULT_BOTS_PER_SCREEN)))
+    GAME["world_size"] = (GAME["screen_size"][0] * scale, GAME["screen_size"][1] * scale)
+
+
+def new_session(bots_count: int) -> GameSession:
+    """Fresh, seeded match with the given number of bots."""
+    random.seed(bots_count)
+    use_bots_count(bots_count)
+    GAME_CLOCK.use_fixed_step()
+    return GameSession()
+
+
+def bench_draw_map(screen: pygame.Surface) -> List[float]:
+    """Map rendering."""
+    return measure(lambda: draw_map(screen), repeat=200)
+
+
+def bench_draw_world(screen: pygame.Surface) -> List[float]:
+    """Map rendering while the viewport pans across a world 8 screens wide and high."""
+    screen_width, screen_height = GAME["screen_size"]
+    world_size = (screen_width * 8, screen_height * 8)
+    renderer = ChunkedMapRenderer(MapGenerator(seed=0), world_size)
+    viewport = pygame.Rect((0, 0), GAME["screen_size"])
+
+    def run() -> None:
+        # a diagonal pan at tank speed, wrapping at the far corner
+        viewport.x = (viewport.x + 2) % (world_size[0] - screen_width)
+        viewport.y = (viewport.y + 2) % (world_size[1] - screen_height)
+        renderer.draw(screen, viewport)
+
+    return measure(run, repeat=600)
+
+
+def bench_flow_field() -> List[float]:
+    """A full flow field search over a world 8 screens wide and high."""
+    tile_width, tile_height = TILE["size"]
+    columns = GAME["screen_size"][0] * 8 // tile_width
+    rows = GAME["screen_size"][1] * 8 // tile_height
+    flow_field = FlowField(MapGenerator(seed=0).generate_region(0, 0, columns, rows))
+    # a different target tile every round, so every round searches
+    targets = [(i * tile_width * columns // 8, i * tile_height * rows // 8) for i in range(8)]
+
+    def run() -> None:
+        flow_field.set_target(*targets[flow_field.searches % len(targets)])
+        flow_field.finish()
+
+    return measure(run, repeat=20)
+
+
+def bench_generate_bots(bots_count: int) -> List[float]:
+    """Spawning bots."""
+    use_bots_count(bots_count)
+    random.seed(bots_count)
+    return measure(
+        lambda: generate_bots(spatial_index=SpatialHash()), repeat=10, budget=5.0, warmup=0)
+
+
+def bench_is_colliding_tank(bots_count: int) -> List[float]:
+    """One collision check for every bot, stepping one pixel to the right."""
+    session = new_session(bots_count)
+
+    def run() -> None:
+        for bot in session.bot_tanks:
+            bot.is_colliding_tank(bot.rect.move(1, 0), session.all_tanks)
+
+    return measure(run)
+
+
+def bench_process_bullet_collision(bots_count: int, bullets_count: int) -> List[float]:
+    """Bullet hits against all tanks."""
+    session = new_session(bots_count)
+    player = session.player_tank
+    world_width, world_height = GAME["world_size"]
+    rng = random.Random(bullets_count)
+    positions = [
+        (rng.uniform(0, world_width), rng.uniform(0, world_height), rng.choice(["UP", "DOWN", "LEFT", "RIGHT"]))
+        for _ in range(bullets_count)
+    ]
+
+    def setup() -> None:
+        # restore the tanks hit in the previous round and refill the bullets
+        for tank in session.bot_tanks:
+            tank.health = 1
+            tank.is_alive = True
+            if tank not in session.tank_index:
+                session.all_tanks.append(tank)
+                session.tank_index.insert(tank, tank.rect)
+        for bullet in player.bullets.live[:]:
+            player.bullets.release(bullet)
+        for x, y, direction in positions:
+            player.bullets.spawn(x, y, direction, asset=player.bullet_asset)
+
+    return measure(lambda: player.process_bullet_collision(session.all_tanks), setup=setup)
+
+
+def bench_move_randomly(bots_count: int) -> List[float]:
+    """One movement step for every bot."""
+    session = new_session(bots_count)
+
+    def run() -> None:
+        for bot in session.bot_tanks:
+            bot.move_randomly(session.all_tanks)
+        GAME_CLOCK.advance()
+
+    return measure(run)
+
+
+def bench_frame(screen: pygame.Surface, bots_count: int) -> List[float]:
+    """A full game_life_cycle frame: input, update and draw, without flip."""
+    session = new_session(bots_count)
+    input_source = AutoPilotInput()
+
+    def run() -> None:
+        session.update(input_source.get_pressed(session))
+        session.draw(screen)
+
+    return measure(run, repeat=200)
+
+
+def bench_draw_crowd(screen: pygame.Surface) -> List[float]:
+    """Drawing a screen full of tanks and their health bars."""
+    saved = {key: GAME[key] for key in ("bots_count", "world_size")}
+    random.seed(CROWD_BOTS_COUNT)
+    GAME["bots_count"] = CROWD_BOTS_COUNT
+    GAME["world_size"] = GAME["screen_size"]
+    GAME_CLOCK.use_fixed_step()
+    try:
+        session = GameSession()
+        return measure(lambda: session.draw(screen), repeat=200)
+    finally:
+        GAME.update(saved)
+
+
+def bench_explosions(screen: pygame.Surface) -> List[float]:
+    """Drawing a screen full of explosions, restarted as they finish."""
+    # a single screen of bots, whatever scenario ran before
+    session = new_session(DEFAULT_BOTS_PER_SCREEN)
+    width, height = GAME["screen_size"]
+    # every explosion takes a slot for itself and one per smoke puff
+    effects_count = EXPLOSIONS_COUNT * (1 + len(SMOKE_OFFSETS))
+
+    def setup() -> None:
+        session.effects.update()
+        while len(session.effects) < effects_count:
+            session.effects.explode(random.uniform(0, width), random.uniform(0, height))
+
+    def run() -> None:
+        session.draw(screen)
+        GAME_CLOCK.advance()
+
+    return measure(run, setup=setup, repeat=200)
+
+
+def run_benchmarks(bot_counts: List[int], bullet_counts: List[int]) -> BenchmarkResults:
+    """Run every scenario and summarize each one."""
+    pygame.init()
+    screen = pygame.display.set_mode(GAME["screen_size"])
+    # time the game logic, not the mixing and synthesis of its sounds
+    SOUNDS.is_enabled = False
+    default_bots_count = GAME["bots_count"]
+    default_world_size = GAME["world_size"]
+
+    scenarios: Dict[str, Callable[[], List[float]]] = {
+        "draw_map": lambda: bench_draw_map(screen),
+        "draw_world": lambda: bench_draw_world(screen),
+        "flow_field": bench_flow_field,
+        "draw_crowd": lambda: bench_draw_crowd(screen),
+        "explosions": lambda: bench_explosions(screen),
+    }
+    for bots_count in bot_counts:
+        scenarios[f"generate_bots[{bots_count}]"] = (
+            lambda count=bots_count: bench_generate_bots(count))
+        scenarios[f"is_colliding_tank[{bots_count}]"] = (
+            lambda count=bots_count: bench_is_colliding_tank(count))
+        scenarios[f"move_randomly[{bots_count}]"] = (
+            lambda count=bots_count: bench_move_randomly(count))
+        scenarios[f"frame[{bots_count}]"] = (
+            lambda count=bots_count: bench_frame(screen, count))
+        for bullets_count in bullet_counts:
+            scenarios[f"process_bullet_collision[{bots_count}x{bullets_count}]"] = (
+                lambda count=bots_count, bullets=bullets_count:
+                bench_process_bullet_collision(count, bullets))
+
+    results: BenchmarkResults = {}
+    for name, scenario in scenarios.items():
+        results[name] = summarize(scenario())
+        print(f"{name:<45} mean {results[name]['mean_ms']:9.3f} ms"
+              f"  p95 {results[name]['p95_ms']:9.3f} ms"
+              f"  p99 {results[name]['p99_ms']:9.3f} ms")
+
+    GAME["bots_count"] = default_bots_count
+    GAME["world_size"] = default_world_size
+    GAME_CLOCK.use_wall_clock()
+    pygame.quit()
+    return results
+
+
+def compare(results: BenchmarkResults, baseline: BenchmarkResults, threshold: float) -> bool:
+    """Print the change against the baseline, return whether anything regressed."""
+    has_regression = False
+    for name, summary in results.items():
+        if name not in baseline:
+            continue
+        base_mean = baseline[name]["mean_ms"]
+        change = (summary["mean_ms"] - base_mean) / base_mean * 100 if base_mean else 0.0
+        status = "ok"
+        if change > threshold:
+            status = "REGRESSION"
+            has_regression = True
+        elif change < -threshold:
+            status = "faster"
+        print(f"{name:<45} {base_mean:9.3f} -> {summary['mean_ms']:9.3f} ms ({change:+6.1f}%) {status}")
+    return has_regression
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="where to write the results (JSON)")
+    parser.add_argument("--baseline", help="stored results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="percent slowdown of the mean counted as a regression")
+    parser.add_argument("--bots", default=",".join(str(count) for count in BOT_COUNTS),
+                        help="comma separated bots_count values")
+    parser.add_argument("--bullets", default=",".join(str(count) for count in BULLET_COUNTS),
+                        help="comma separated bullet counts")
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        [int(count) for count in args.bots.split(",")],
+        [int(count) for count in args.bullets.split(",")],
+    )
+    report = {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=4)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,179 @@
 Rogue-Like Tank Game
 """
 
-from internals import game_life_cycle
+import os
+import json
+import argparse
 
-try:
-    game_life_cycle()
-except Exception as e:
-    print(f"Game crashed! {e}")
+# replay files store the seed as an unsigned 64-bit number
+MAX_SEED = (1 << 64) - 1
+
+
+def parse_seed(value):
+    """Match seed from the command line, from 0 to MAX_SEED."""
+    seed = int(value)
+    if not 0 <= seed <= MAX_SEED:
+        raise argparse.ArgumentTypeError(f"seed must be from 0 to {MAX_SEED}, got {seed}")
+    return seed
+
+
+parser = argparse.ArgumentParser(description="Rogue-Like Tank Game")
+parser.add_argument(
+    "--headless",
+    action="store_true",
+    help="simulate a match without a window, sound or frame cap",
+)
+parser.add_argument(
+    "--profile",
+    metavar="PATH",
+    help="stream per-frame phase timings to a .jsonl or .csv file",
+)
+parser.add_argument(
+    "--map-seed",
+    type=int,
+    metavar="SEED",
+    help="play on a generated map, the same seed gives the same map",
+)
+parser.add_argument(
+    "--world-scale",
+    type=int,
+    metavar="N",
+    help="make the world N screens wide and N screens high, the camera follows the player",
+)
+parser.add_argument(
+    "--dirty-rects",
+    action="store_true",
+    help="repaint only the screen areas that changed each frame",
+)
+parser.add_argument(
+    "--seed",
+    type=parse_seed,
+    help="seed of the match, the same seed spawns the same bots",
+)
+parser.add_argument(
+    "--record",
+    metavar="PATH",
+    help="record the match's inputs to a replay file",
+)
+parser.add_argument(
+    "--replay",
+    metavar="PATH",
+    help="play a replay file headless at full speed and verify its final state",
+)
+parser.add_argument(
+    "--chase",
+    action="store_true",
+    help="bots chase the player along the cheapest tiles instead of wandering",
+)
+parser.add_argument(
+    "--obstacles",
+    type=float,
+    metavar="DENSITY",
+    help="share of the off-road tiles covered by obstacles, 0 for none",
+)
+parser.add_argument(
+    "--batch",
+    type=int,
+    metavar="N",
+    help="play N headless matches per config over all cores and report them together",
+)
+parser.add_argument(
+    "--batch-configs",
+    metavar="PATH",
+    help="JSON file of named GAME overrides to compare, e.g. {\"easy\": {\"bots_count\": 10}}",
+)
+parser.add_argument(
+    "--set",
+    action="append",
+    default=[],
+    metavar="KEY=VALUE",
+    help="GAME override for the batch (JSON value), may be repeated",
+)
+parser.add_argument(
+    "--processes",
+    type=int,
+    help="size of the batch's process pool, defaults to the number of cores",
+)
+parser.add_argument(
+    "--pack-assets",
+    action="store_true",
+    help="pack the images, pre-scaled, into the bundle file loaded at start up",
+)
+
+
+def parse_overrides(settings):
+    """GAME overrides from KEY=VALUE strings, values are JSON or plain strings."""
+    overrides = {}
+    for setting in settings:
+        key, _, value = setting.partition("=")
+        try:
+            overrides[key] = json.loads(value)
+        except ValueError:
+            overrides[key] = value
+    return overrides
+
+
+def main():
+    """Run the game, or the headless tool picked on the command line."""
+    args = parser.parse_args()
+
+    if args.headless or args.replay or args.batch or args.pack_assets:
+        # SDL picks its drivers when pygame initialises, so set them before import
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    # pylint: disable=import-outside-toplevel
+    from internals import game_life_cycle, run_headless, print_report
+    from internals import Replay, run_replay, print_replay_report
+    from internals import run_batch, print_batch_report
+    from internals.asset_bundle import pack_bundle
+    from internals.game_configs import ASSET_BUNDLE, GAME, PROFILER, REPLAY
+
+    if args.profile:
+        PROFILER["output"] = args.profile
+    if args.map_seed is not None:
+        GAME["random_map"] = True
+        GAME["map_seed"] = args.map_seed
+    REPLAY["seed"] = args.seed
+    REPLAY["record"] = args.record
+    if args.chase:
+        GAME["bot_ai"] = "flow_field"
+    if args.obstacles is not None:
+        GAME["obstacle_density"] = args.obstacles
+    if args.dirty_rects:
+        GAME["dirty_rects"] = True
+    if args.world_scale is not None:
+        GAME["world_size"] = (GAME["screen_size"][0] * args.world_scale,
+                              GAME["screen_size"][1] * args.world_scale)
+
+    try:
+        if args.pack_assets:
+            image_count = pack_bundle(ASSET_BUNDLE["path"])
+            print(f"Packed {image_count} images into {ASSET_BUNDLE['path']}")
+        elif args.batch:
+            if args.batch_configs:
+                with open(args.batch_configs, encoding="utf-8") as file:
+                    batch_configs = json.load(file)
+            else:
+                batch_configs = {"default": {}}
+            for overrides in batch_configs.values():
+                overrides.update(parse_overrides(args.set))
+            first_seed = args.seed if args.seed is not None else 1
+            seeds = list(range(first_seed, first_seed + args.batch))
+            print_batch_report(run_batch(batch_configs, seeds, args.processes))
+        elif args.replay:
+            print_replay_report(run_replay(args.replay))
+        elif args.headless:
+            recording = Replay(0) if args.record else None
+            print_report(run_headless(seed=args.seed, recording=recording))
+            if recording is not None:
+                recording.save(args.record)
+        else:
+            game_life_cycle()
+    except Exception as e:
+        print(f"Game crashed! {e}")
+
+
+# batch workers started by spawn import this file again, they must not rerun the game
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 """Game internals interface."""
 
 from .game_life_cycle import game_life_cycle as glc
+from .headless import run_headless, print_report
+from .replay import Replay, run_replay, print_replay_report
+from .batch_runner import run_batch, print_batch_report
 
 game_life_cycle = glc
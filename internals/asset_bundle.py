@@ -0,0 +1,155 @@
+"""
+Asset bundle.
+Images pre-scaled to their game sizes and packed as raw pixels into one
+file, which is memory-mapped at run time instead of decoding PNGs.
+"""
+
+import os
+import json
+import mmap
+import struct
+from typing import Dict, List, Optional, Set, Tuple
+
+import pygame
+
+from .game_configs import BOT_TANK, BULLET, EXPLOSION, OBSTACLE, PLAYER_TANK, TILE, TILES, TRAIL
+
+ImageSize = Optional[Tuple[int, int]]
+# offset, width and height of an image's pixels in the bundle
+BundleEntry = Tuple[int, int, int]
+
+# File layout:
+#   header  magic, version, index length (u32), little endian
+#   index   JSON list of {path, size, width, height, offset, mtime_ns,
+#           file_size}, size is null for an image at its file's own size
+#   pixels  RGBA rows of every image, in index order
+MAGIC = b"TNKA"
+VERSION = 1
+HEADER = struct.Struct("<4sBI")
+PIXEL_FORMAT = "RGBA"
+
+
+def get_bundle_images() -> List[Tuple[str, ImageSize]]:
+    """Image files and the sizes the game asks for them in."""
+    images: List[Tuple[str, ImageSize]] = [
+        (PLAYER_TANK["asset"], PLAYER_TANK["size"]),
+        (PLAYER_TANK["death_asset"], PLAYER_TANK["size"]),
+        (PLAYER_TANK["bullet_asset"], BULLET["size"]),
+        (BULLET["asset"], BULLET["size"]),
+        (BOT_TANK["asset"], BOT_TANK["size"]),
+        (BOT_TANK["death_asset"], BOT_TANK["size"]),
+    ]
+    images.extend((f"assets/imgs/tiles/{file_name}", TILE["size"]) for file_name in TILES.values())
+    for kind in OBSTACLE["health"]:
+        # obstacles are sized from their file, so both sizes are packed
+        path = f"{OBSTACLE['assets']}/{kind}.png"
+        width, height = pygame.image.load(path).get_size()
+        images.append((path, None))
+        images.append((path, (int(width * OBSTACLE["scale"]), int(height * OBSTACLE["scale"]))))
+    scaled = [(path, EXPLOSION["scale"]) for path in EXPLOSION["assets"]]
+    scaled.extend(TRAIL["tracks"].values())
+    for path, scale in scaled:
+        width, height = pygame.image.load(path).get_size()
+        images.append((path, None))
+        images.append((path, (int(width * scale), int(height * scale))))
+    return images
+
+
+def pack_bundle(path: str, images: Optional[List[Tuple[str, ImageSize]]] = None) -> int:
+    """Write the bundle file, return the number of images packed."""
+    if images is None:
+        images = get_bundle_images()
+    index = []
+    pixels = bytearray()
+    for image_path, size in images:
+        img = pygame.image.load(image_path)
+        if size is not None:
+            # the same transform AssetRegistry applies, so pixels match exactly
+            img = pygame.transform.scale(img, size)
+        stat = os.stat(image_path)
+        index.append({
+            "path": image_path,
+            "size": list(size) if size is not None else None,
+            "width": img.get_width(),
+            "height": img.get_height(),
+            "offset": len(pixels),
+            "mtime_ns": stat.st_mtime_ns,
+            "file_size": stat.st_size,
+        })
+        pixels += pygame.image.tobytes(img, PIXEL_FORMAT)
+
+    encoded_index = json.dumps(index, separators=(",", ":")).encode()
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(encoded_index)))
+        file.write(encoded_index)
+        file.write(pixels)
+    return len(index)
+
+
+class AssetBundle:
+    """Memory-mapped bundle handing out surfaces over its pixels.
+
+    Images whose source file changed since packing are left out, so the
+    registry loads those from their PNG instead.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.entries: Dict[Tuple[str, ImageSize], BundleEntry] = {}
+        self.paths: Set[str] = set()
+        self.stale_count = 0
+        self.hits = 0
+
+        with open(path, "rb") as file:
+            # a private copy-on-write mapping, pages are read only when used
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, index_length = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} asset bundle")
+        pixels_start = HEADER.size + index_length
+        index = json.loads(self.data[HEADER.size:pixels_start])
+
+        sources: Dict[str, Optional[os.stat_result]] = {}
+        for entry in index:
+            source = entry["path"]
+            if source not in sources:
+                sources[source] = os.stat(source) if os.path.exists(source) else None
+            stat = sources[source]
+            if stat is None or (stat.st_mtime_ns, stat.st_size) != (entry["mtime_ns"], entry["file_size"]):
+                self.stale_count += 1
+                continue
+            size = tuple(entry["size"]) if entry["size"] is not None else None
+            self.entries[(source, size)] = (pixels_start + entry["offset"], entry["width"], entry["height"])
+            self.paths.add(source)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def has_file(self, path: str) -> bool:
+        """Whether any size of an image file is packed."""
+        return path in self.paths
+
+    def get_image(self, path: str, size: ImageSize = None) -> Optional[pygame.Surface]:
+        """Surface over the packed pixels of an image, None when it is not packed."""
+        entry = self.entries.get((path, size))
+        if entry is None:
+            return None
+        offset, width, height = entry
+        self.hits += 1
+        pixels = memoryview(self.data)[offset:offset + width * height * len(PIXEL_FORMAT)]
+        return pygame.image.frombuffer(pixels, (width, height), PIXEL_FORMAT)
+
+
+def open_bundle(path: str) -> Optional[AssetBundle]:
+    """Open the bundle if it exists and is usable, telling when it needs repacking."""
+    if not os.path.exists(path):
+        return None
+    try:
+        bundle = AssetBundle(path)
+    except (ValueError, struct.error, json.JSONDecodeError) as e:
+        print(f"Ignoring the asset bundle: {e}")
+        return None
+    if bundle.stale_count:
+        print(f"{bundle.stale_count} images changed since {path} was packed, "
+              "they load from their files until it is packed again (--pack-assets)")
+    return bundle
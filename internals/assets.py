@@ -0,0 +1,214 @@
+"""
+Shared asset registry.
+Images, sounds and fonts are loaded once and handed out to every user.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import pygame
+
+from .asset_bundle import AssetBundle, open_bundle
+from .game_configs import ASSET_BUNDLE
+
+ImageSize = Optional[Tuple[int, int]]
+ImageKey = Tuple[str, ImageSize, int]
+SpriteFrame = Tuple[pygame.Surface, Tuple[int, int]]
+SpriteFrames = Dict[str, SpriteFrame]
+RotationsKey = Tuple[str, Tuple[int, int], Tuple[Tuple[str, int], ...]]
+
+
+class AssetRegistry:
+    """Cache of display-converted surfaces keyed by (path, size, rotation)."""
+
+    def __init__(self, max_images: int = 256) -> None:
+        self.max_images = max_images
+        self.images: "OrderedDict[ImageKey, pygame.Surface]" = OrderedDict()
+        self.unconverted: Set[ImageKey] = set()
+        self.rotations: Dict[RotationsKey, SpriteFrames] = {}
+        self.sounds: Dict[str, pygame.mixer.Sound] = {}
+        self.fonts: Dict[Tuple[str, int], pygame.font.Font] = {}
+        self.is_audio_available = True
+        self.bundle: Optional[AssetBundle] = None
+        self.is_bundle_opened = False
+        # image files decoded by an AssetPreloader, waiting for their first use
+        self.decoded: Dict[str, pygame.Surface] = {}
+        self.decoded_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_image(
+        self,
+        path: str,
+        size: ImageSize = None,
+        rotation: int = 0,
+    ) -> pygame.Surface:
+        """Get a shared surface, loading, scaling and rotating it on first use."""
+        key: ImageKey = (path, tuple(size) if size else None, rotation % 360)
+        img = self.images.get(key)
+        if img is not None:
+            self.hits += 1
+            self.images.move_to_end(key)
+            if key in self.unconverted:
+                img = self.convert(key, img)
+            return img
+
+        self.misses += 1
+        img = self.convert(key, self.build_image(*key))
+        self.images[key] = img
+        # least recently used surfaces are evicted first
+        while len(self.images) > self.max_images:
+            evicted_key, _ = self.images.popitem(last=False)
+            self.unconverted.discard(evicted_key)
+            self.evictions += 1
+        return img
+
+    def build_image(self, path: str, size: ImageSize, rotation: int) -> pygame.Surface:
+        """Build a surface variant from the cached, less transformed variant."""
+        if rotation:
+            return pygame.transform.rotate(self.get_image(path, size), rotation)
+        bundle = self.get_bundle()
+        if bundle is not None:
+            img = bundle.get_image(path, size)
+            if img is not None:
+                return img
+        if size:
+            return pygame.transform.scale(self.get_image(path), size)
+        with self.decoded_lock:
+            img = self.decoded.pop(path, None)
+        return img if img is not None else pygame.image.load(path)
+
+    def get_bundle(self) -> Optional[AssetBundle]:
+        """Open the packed images on first use, None without a bundle file."""
+        if not self.is_bundle_opened:
+            self.is_bundle_opened = True
+            self.bundle = open_bundle(ASSET_BUNDLE["path"])
+        return self.bundle
+
+    def add_decoded(self, path: str, img: pygame.Surface) -> None:
+        """Keep an image file decoded off the main thread until it is used."""
+        if (path, None, 0) in self.images:
+            return
+        with self.decoded_lock:
+            self.decoded[path] = img
+
+    def convert(self, key: ImageKey, img: pygame.Surface) -> pygame.Surface:
+        """Convert to the display pixel format once a display exists."""
+        if pygame.display.get_surface() is None:
+            self.unconverted.add(key)
+            return img
+        img = img.convert_alpha()
+        self.unconverted.discard(key)
+        if key in self.images:
+            self.images[key] = img
+        return img
+
+    def get_rotations(
+        self,
+        path: str,
+        size: Tuple[int, int],
+        angles: Dict[str, int],
+    ) -> SpriteFrames:
+        """Get every rotation of an image with the blit offset that keeps it centred."""
+        key: RotationsKey = (path, tuple(size), tuple(angles.items()))
+        frames = self.rotations.get(key)
+        if frames is not None:
+            return frames
+
+        # the table keeps its own references, so LRU eviction never drops it
+        width, height = size
+        frames = {}
+        for direction, angle in angles.items():
+            img = self.get_image(path, size, angle)
+            offset = ((width - img.get_width()) // 2,
+                      (height - img.get_height()) // 2)
+            frames[direction] = (img, offset)
+        self.rotations[key] = frames
+        return frames
+
+    def init_mixer(self) -> bool:
+        """Start the mixer on first use, return whether sound can play."""
+        if pygame.mixer.get_init() is None and self.is_audio_available:
+            try:
+                pygame.mixer.init()
+            except pygame.error as e:
+                print(f"No sound: {e}")
+                self.is_audio_available = False
+        return self.is_audio_available
+
+    def get_sound(self, path: str) -> Optional[pygame.mixer.Sound]:
+        """Get a shared sound, None when there is no audio device."""
+        if path not in self.sounds:
+            if not self.init_mixer():
+                return None
+            self.sounds[path] = pygame.mixer.Sound(path)
+        return self.sounds[path]
+
+    def get_font(self, path: str, size: int) -> pygame.font.Font:
+        """Get a shared font, starting the font module on first use."""
+        key = (path, size)
+        if key not in self.fonts:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self.fonts[key] = pygame.font.Font(path, size)
+        return self.fonts[key]
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Cache counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "images": len(self.images),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bundled": self.bundle.hits if self.bundle is not None else 0,
+        }
+
+
+class AssetPreloader:
+    """Decodes image files on a background thread.
+
+    Only the file decode runs off the main thread, the registry still
+    scales, rotates and converts each image on the main thread when it is
+    first used.
+    """
+
+    def __init__(self, registry: AssetRegistry, paths: Iterable[str]) -> None:
+        self.registry = registry
+        # packed images skip decoding altogether
+        bundle = registry.get_bundle()
+        self.paths: List[str] = [
+            path for path in dict.fromkeys(paths) if bundle is None or not bundle.has_file(path)]
+        self.loaded = 0
+        self.thread = threading.Thread(target=self.run, name="asset-preloader", daemon=True)
+
+    @property
+    def progress(self) -> float:
+        """Share of the files decoded."""
+        return self.loaded / len(self.paths) if self.paths else 1.0
+
+    @property
+    def is_done(self) -> bool:
+        """Whether every file is decoded."""
+        return self.loaded == len(self.paths)
+
+    def start(self) -> None:
+        """Start decoding in the background."""
+        self.thread.start()
+
+    def run(self) -> None:
+        """Decode the files in order."""
+        for path in self.paths:
+            try:
+                self.registry.add_decoded(path, pygame.image.load(path))
+            except (pygame.error, FileNotFoundError) as e:
+                # left to the main thread, which fails where the image is used
+                print(f"Could not preload {path}: {e}")
+            self.loaded += 1
+
+
+ASSETS = AssetRegistry()
@@ -0,0 +1,146 @@
+"""
+Batch matches.
+Plays many headless matches over a pool of processes and aggregates their
+reports, to compare settings such as bot count and speed.
+"""
+
+import os
+import time
+import multiprocessing
+from typing import Dict, List, Optional, Tuple, Union
+
+from .game_configs import GAME
+from .headless import SimulationReport, run_headless, use_dummy_drivers
+from .profiler import percentile
+from .replay import REPLAY_CONFIG_KEYS
+
+# GAME settings to change, keys of REPLAY_CONFIG_KEYS
+Overrides = Dict[str, object]
+# config name, seed and the full GAME settings of one match
+Match = Tuple[str, int, Overrides]
+BatchReport = Dict[str, object]
+
+COUNTERS = ["tank_collisions", "obstacle_collisions", "bullet_hits"]
+
+
+def init_worker() -> None:
+    """Prepare a pool process to run matches without a window or sound."""
+    use_dummy_drivers()
+
+
+def play_match(match: Match) -> Tuple[str, SimulationReport]:
+    """Play one match with its settings, in the current process."""
+    name, seed, settings = match
+    GAME.update(settings)
+    cpu_start = time.process_time()
+    report = run_headless(seed=seed)
+    # wall time stretches when processes outnumber cores, CPU time does not
+    report["cpu_time"] = time.process_time() - cpu_start
+    return name, report
+
+
+def summarize(reports: List[SimulationReport]) -> Dict[str, Union[int, float, None]]:
+    """Win rate, time to win, speed and collision figures of a config's matches."""
+    win_times = [report["time_to_win"] for report in reports if report["won"]]
+    summary: Dict[str, Union[int, float, None]] = {
+        "matches": len(reports),
+        "wins": len(win_times),
+        "win_rate": len(win_times) / len(reports),
+        "time_to_win_mean": sum(win_times) / len(win_times) if win_times else None,
+        "time_to_win_p50": percentile(win_times, 50) if win_times else None,
+        "time_to_win_p95": percentile(win_times, 95) if win_times else None,
+        "time_to_win_max": max(win_times, default=None),
+        "ticks_per_second": sum(report["ticks_per_second"] for report in reports) / len(reports),
+    }
+    for counter in COUNTERS:
+        summary[counter] = sum(report[counter] for report in reports) / len(reports)
+    return summary
+
+
+def run_batch(
+    configs: Dict[str, Overrides],
+    seeds: List[int],
+    processes: Optional[int] = None,
+    start_method: Optional[str] = None,
+) -> BatchReport:
+    """Play every config against every seed, spread over a process pool.
+
+    Each match is sent with all of its GAME settings, so it plays the same
+    whatever ran before it in the worker and however the pool starts
+    processes ("fork", "spawn" or "forkserver", the platform's default
+    when not given). All configs share the seeds, so they face the same
+    spawns.
+    """
+    for name, overrides in configs.items():
+        unknown = set(overrides) - set(REPLAY_CONFIG_KEYS)
+        if unknown:
+            raise ValueError(f"config {name!r} sets unknown keys: {', '.join(sorted(unknown))}")
+    base = {key: GAME[key] for key in REPLAY_CONFIG_KEYS}
+    matches: List[Match] = [
+        (name, seed, {**base, **overrides})
+        for name, overrides in configs.items()
+        for seed in seeds
+    ]
+    processes = max(1, min(processes or os.cpu_count() or 1, len(matches)))
+
+    start_time = time.perf_counter()
+    if processes == 1:
+        init_worker()
+        try:
+            results = [play_match(match) for match in matches]
+        finally:
+            GAME.update(base)
+    else:
+        context = multiprocessing.get_context(start_method)
+        with context.Pool(processes, initializer=init_worker) as pool:
+            # matches take long enough that handing them out one by one balances the load
+            results = list(pool.imap_unordered(play_match, matches, chunksize=1))
+            # SDL catches SIGTERM once pygame is initialised, so let the workers
+            # exit on their own instead of having the pool terminate them
+            pool.close()
+            pool.join()
+    wall_time = time.perf_counter() - start_time
+
+    reports: Dict[str, List[SimulationReport]] = {name: [] for name in configs}
+    for name, report in results:
+        reports[name].append(report)
+    for config_reports in reports.values():
+        config_reports.sort(key=lambda report: report["seed"])
+
+    ticks = sum(report["ticks"] for _, report in results)
+    cpu_time = sum(report["cpu_time"] for _, report in results)
+    return {
+        "processes": processes,
+        "wall_time": wall_time,
+        "ticks": ticks,
+        "ticks_per_second": ticks / wall_time if wall_time else 0.0,
+        # CPU time of all matches over wall time, close to `processes` when it scales
+        "speedup": cpu_time / wall_time if wall_time else 0.0,
+        "configs": {
+            name: {"overrides": configs[name], **summarize(config_reports)}
+            for name, config_reports in reports.items()
+        },
+        "matches": {name: config_reports for name, config_reports in reports.items()},
+    }
+
+
+def format_seconds(value: Optional[float]) -> str:
+    """Seconds with one decimal, a dash when there is no value."""
+    return f"{value:.1f}s" if value is not None else "-"
+
+
+def print_batch_report(report: BatchReport) -> None:
+    """Print a batch report, one line per config, collisions are per match."""
+    print(f"{'config':<16} {'wins':>9} {'win time':>9} {'p95':>8} {'max':>8}"
+          f" {'ticks/s':>8} {'tank col':>9} {'obst col':>9} {'hits':>6}")
+    for name, summary in report["configs"].items():
+        print(f"{name:<16} {summary['wins']:>4}/{summary['matches']:<4}"
+              f" {format_seconds(summary['time_to_win_mean']):>9}"
+              f" {format_seconds(summary['time_to_win_p95']):>8}"
+              f" {format_seconds(summary['time_to_win_max']):>8}"
+              f" {summary['ticks_per_second']:>8.0f}"
+              f" {summary['tank_collisions']:>9.0f}"
+              f" {summary['obstacle_collisions']:>9.0f}"
+              f" {summary['bullet_hits']:>6.0f}")
+    print(f"{report['ticks']} ticks in {report['wall_time']:.2f} s on {report['processes']} processes:"
+          f" {report['ticks_per_second']:.0f} ticks/sec, {report['speedup']:.1f}x one process")
@@ -0,0 +1,310 @@
+"""
+Bot swarm.
+Batched bot movement over NumPy arrays (optional, needs numpy).
+"""
+
+from typing import TYPE_CHECKING, List, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+from .game_configs import GAME, TILE
+
+if TYPE_CHECKING:
+    from .flow_field import FlowField
+    from .bot_tank import MovableBotTank
+    from .obstacles import ObstacleLayer
+    from .player_tank import PlayerTank
+
+# same order as MovableBotTank.get_new_direction and the flow field codes
+DIRECTIONS = ["UP", "DOWN", "LEFT", "RIGHT"]
+# unit steps matching sin/cos of TANK_DIRECTION in BotEnemy.move
+STEP_X = [0, 0, -1, 1]
+STEP_Y = [-1, 1, 0, 0]
+
+
+def is_available() -> bool:
+    """Whether numpy is installed."""
+    return np is not None
+
+
+class BotSwarm:
+    """Struct-of-arrays state for all bots, advanced in one vectorized step.
+
+    Moves and their collisions with tanks and obstacles are resolved on
+    the arrays, all bots at once. The MovableBotTank objects stay as thin
+    views: the swarm writes back position, direction and collision counts
+    of the bots a step changed, and reads health back when a tank dies.
+    """
+
+    def __init__(self, bots: List["MovableBotTank"], seed: Optional[int] = None) -> None:
+        if np is None:
+            raise ImportError("BotSwarm needs numpy, install it with 'pip install numpy'")
+        self.bots = bots
+        self.members = set(bots)
+        self.rng = np.random.default_rng(seed)
+        self.step_x = np.array(STEP_X, dtype=np.float64)
+        self.step_y = np.array(STEP_Y, dtype=np.float64)
+
+        self.x = np.array([bot.x for bot in bots], dtype=np.float64)
+        self.y = np.array([bot.y for bot in bots], dtype=np.float64)
+        self.width = np.array([bot.rect.width for bot in bots], dtype=np.int64)
+        self.height = np.array([bot.rect.height for bot in bots], dtype=np.int64)
+        self.direction = np.array(
+            [DIRECTIONS.index(bot.current_direction) for bot in bots], dtype=np.int8)
+        self.speed = np.array([bot.speed for bot in bots], dtype=np.float64)
+        self.health = np.array([bot.health for bot in bots], dtype=np.int32)
+        self.alive = self.health > 0
+        self.interval = np.array(
+            [bot.movement_interval for bot in bots], dtype=np.int64)
+        self.last_change = np.array(
+            [bot.last_move_time for bot in bots], dtype=np.int64)
+
+        # tanks outside the swarm (the player), refreshed when a tank dies
+        self.others: List[Union["PlayerTank", "MovableBotTank"]] = []
+        self.tank_count = -1
+
+        self.spatial_index = bots[0].spatial_index if bots else None
+        self.obstacles: Optional["ObstacleLayer"] = bots[0].obstacles if bots else None
+        if self.obstacles is not None:
+            layer = self.obstacles
+            # shares memory with the layer, destroyed obstacles show up as empty cells
+            self.obstacle_cells = np.frombuffer(layer.cells, dtype=np.uint32).reshape(
+                layer.rows, layer.columns)
+            # obstacle rects by cell slot, slot 0 stands for an empty cell
+            rects = [(0, 0, 0, 0)] + [tuple(obstacle.rect) for obstacle in layer.obstacles]
+            self.obstacle_rects = np.array(rects, dtype=np.int64).reshape(-1, 4)
+
+    def step(
+        self,
+        current_time: int,
+        tanks_list: List[Union["PlayerTank", "MovableBotTank"]],
+        flow_field: Optional["FlowField"] = None,
+    ) -> None:
+        """Advance every bot by one tick, steered by the flow field if given."""
+        if len(tanks_list) != self.tank_count:
+            self.sync_alive(tanks_list)
+        alive = self.alive
+
+        # pick new random directions for bots whose interval ran out
+        changed = alive & (current_time - self.last_change >= self.interval)
+        changed_count = int(changed.sum())
+        if changed_count:
+            self.direction[changed] = self.rng.integers(
+                0, len(DIRECTIONS), changed_count)
+            self.last_change[changed] = current_time
+        if flow_field is not None:
+            changed |= self.steer(flow_field)
+
+        # move and clamp to the world boundaries
+        world_width, world_height = GAME["world_size"]
+        new_x = self.x + self.speed * self.step_x[self.direction]
+        new_y = self.y + self.speed * self.step_y[self.direction]
+        np.clip(new_x, 0, world_width - self.width, out=new_x)
+        np.clip(new_y, 0, world_height - self.height, out=new_y)
+        moved = alive & ((new_x != self.x) | (new_y != self.y))
+
+        # the same checks as BotEnemy.move, tanks first, then obstacles
+        obstacle_blocked = self.find_obstacle_blocked(moved, new_x, new_y)
+        tank_blocked = self.find_tank_blocked(moved, moved & ~obstacle_blocked, new_x, new_y)
+        obstacle_blocked &= ~tank_blocked
+        moving = moved & ~tank_blocked & ~obstacle_blocked
+
+        self.write_back(changed | moved, moving, tank_blocked, obstacle_blocked, new_x, new_y)
+
+    def sync_alive(self, tanks_list: List[Union["PlayerTank", "MovableBotTank"]]) -> None:
+        """Read back health of the bots and find the tanks outside the swarm."""
+        self.health[:] = [bot.health if bot.is_alive else 0 for bot in self.bots]
+        self.alive = self.health > 0
+        self.others = [tank for tank in tanks_list if tank not in self.members]
+        self.tank_count = len(tanks_list)
+
+    def steer(self, flow_field: "FlowField") -> "np.ndarray":
+        """Point bots along the flow field, return which bots it steered."""
+        tile_width, tile_height = TILE["size"]
+        center_x = self.x.astype(np.int64) + self.width // 2
+        center_y = self.y.astype(np.int64) + self.height // 2
+        cols = np.clip(center_x // tile_width, 0, flow_field.columns - 1)
+        rows = np.clip(center_y // tile_height, 0, flow_field.rows - 1)
+        codes = np.frombuffer(flow_field.directions, dtype=np.uint8).reshape(
+            flow_field.rows, flow_field.columns)[rows, cols]
+        steered = self.alive & (codes > 0)
+
+        # keep to the middle of the tiles, like MovableBotTank.move_along_flow_field
+        direction = codes.astype(np.int8) - 1
+        offset_x = cols * tile_width + tile_width // 2 - center_x
+        offset_y = rows * tile_height + tile_height // 2 - center_y
+        is_horizontal = direction >= 2
+        direction = np.where(
+            is_horizontal & (np.abs(offset_y) > self.speed), np.where(offset_y > 0, 1, 0), direction)
+        direction = np.where(
+            ~is_horizontal & (np.abs(offset_x) > self.speed), np.where(offset_x > 0, 3, 2), direction)
+        self.direction[steered] = direction[steered]
+        return steered
+
+    def find_obstacle_blocked(
+        self, moved: "np.ndarray", new_x: "np.ndarray", new_y: "np.ndarray"
+    ) -> "np.ndarray":
+        """Bots whose new rect runs into an obstacle."""
+        blocked = np.zeros(len(self.bots), dtype=bool)
+        if self.obstacles is None:
+            return blocked
+        indices = np.flatnonzero(moved)
+        left = new_x[indices].astype(np.int64)
+        top = new_y[indices].astype(np.int64)
+        right = left + self.width[indices]
+        bottom = top + self.height[indices]
+
+        # a tank is smaller than a tile, so its rect covers at most 2x2 tiles
+        tile_width, tile_height = TILE["size"]
+        hits = np.zeros(len(indices), dtype=bool)
+        for rows in (top // tile_height, (bottom - 1) // tile_height):
+            for cols in (left // tile_width, (right - 1) // tile_width):
+                slots = self.obstacle_cells[rows, cols]
+                rects = self.obstacle_rects[slots]
+                hits |= ((slots > 0)
+                         & (left < rects[:, 0] + rects[:, 2]) & (rects[:, 0] < right)
+                         & (top < rects[:, 1] + rects[:, 3]) & (rects[:, 1] < bottom))
+        blocked[indices] = hits
+        return blocked
+
+    def find_tank_blocked(
+        self,
+        moved: "np.ndarray",
+        movers: "np.ndarray",
+        new_x: "np.ndarray",
+        new_y: "np.ndarray",
+    ) -> "np.ndarray":
+        """Bots whose new rect runs into another tank.
+
+        A new rect is checked against where every other tank stands now,
+        and against the new rects of the other movers, so two bots never
+        drive into the same free spot on one tick. Overlapping pairs are
+        found by a sweep over the rects sorted by horizontal band and left
+        edge, comparing each rect with the next ones in its band, one
+        vectorized pass per distance.
+        """
+        count = len(self.bots)
+        alive = np.flatnonzero(self.alive)
+        proposed = np.flatnonzero(moved)
+        others = [tank.rect for tank in self.others]
+        # every rect as owner, left, top, width, height, and whether it is a new rect
+        owner = np.concatenate([alive, count + np.arange(len(others)), proposed])
+        left = np.concatenate([
+            self.x[alive].astype(np.int64),
+            np.array([rect.x for rect in others], dtype=np.int64),
+            new_x[proposed].astype(np.int64)])
+        top = np.concatenate([
+            self.y[alive].astype(np.int64),
+            np.array([rect.y for rect in others], dtype=np.int64),
+            new_y[proposed].astype(np.int64)])
+        width = np.concatenate([
+            self.width[alive],
+            np.array([rect.width for rect in others], dtype=np.int64),
+            self.width[proposed]])
+        height = np.concatenate([
+            self.height[alive],
+            np.array([rect.height for rect in others], dtype=np.int64),
+            self.height[proposed]])
+        is_new = np.concatenate([
+            np.zeros(len(alive) + len(others), dtype=bool), np.ones(len(proposed), dtype=bool)])
+        blocked = np.zeros(count + len(others), dtype=bool)
+        if not len(proposed):
+            return blocked[:count]
+
+        # bands as tall as the tallest tank, so overlapping rects share a
+        # band or sit in neighbouring ones; every rect also goes into the
+        # band below as a copy, and two copies are never compared
+        band_height = int(height.max())
+        band = top // band_height
+        owner, left, top, width, height, is_new = (
+            np.concatenate([values, values]) for values in (owner, left, top, width, height, is_new))
+        band = np.concatenate([band, band + 1])
+        is_copy = np.repeat([False, True], len(band) // 2)
+        is_mover = is_new & movers[np.minimum(owner, count - 1)]
+
+        order = np.lexsort((left, band))
+        owner, left, top, width, height, is_new, is_mover, band, is_copy = (
+            values[order]
+            for values in (owner, left, top, width, height, is_new, is_mover, band, is_copy))
+        right = left + width
+        bottom = top + height
+        max_width = int(width.max())
+        for distance in range(1, len(order)):
+            a = slice(0, len(order) - distance)
+            b = slice(distance, len(order))
+            near = (band[a] == band[b]) & (left[b] - left[a] < max_width)
+            if not near.any():
+                break
+            hit = (near & ~(is_copy[a] & is_copy[b]) & (owner[a] != owner[b])
+                   & (left[b] < right[a]) & (top[a] < bottom[b]) & (top[b] < bottom[a]))
+            if not hit.any():
+                continue
+            new_a = is_new[a]
+            new_b = is_new[b]
+            # a new rect against a tank where it stands
+            blocked[owner[a][hit & new_a & ~new_b]] = True
+            blocked[owner[b][hit & new_b & ~new_a]] = True
+            # two bots heading for the same spot both wait
+            both = hit & is_mover[a] & is_mover[b]
+            blocked[owner[a][both]] = True
+            blocked[owner[b][both]] = True
+        return blocked[:count]
+
+    def write_back(
+        self,
+        changed: "np.ndarray",
+        moving: "np.ndarray",
+        tank_blocked: "np.ndarray",
+        obstacle_blocked: "np.ndarray",
+        new_x: "np.ndarray",
+        new_y: "np.ndarray",
+    ) -> None:
+        """Move the bots that got through and sync the views the step changed."""
+        old_left = self.x.astype(np.int64)
+        old_top = self.y.astype(np.int64)
+        self.x[moving] = new_x[moving]
+        self.y[moving] = new_y[moving]
+
+        indices = np.flatnonzero(changed)
+        if not len(indices):
+            return
+        left = self.x[indices].astype(np.int64)
+        top = self.y[indices].astype(np.int64)
+        # the spatial index only needs telling when a bot enters other cells
+        reindex = np.zeros(len(indices), dtype=bool)
+        if self.spatial_index is not None:
+            size = self.spatial_index.cell_size
+            width = self.width[indices]
+            height = self.height[indices]
+            old_left = old_left[indices]
+            old_top = old_top[indices]
+            reindex = ((left // size != old_left // size) | (top // size != old_top // size)
+                       | ((left + width - 1) // size != (old_left + width - 1) // size)
+                       | ((top + height - 1) // size != (old_top + height - 1) // size))
+
+        for i, direction, is_moving, x, y, rect_x, rect_y, tank_hit, obstacle_hit, is_reindexed in zip(
+            indices.tolist(),
+            self.direction[indices].tolist(),
+            moving[indices].tolist(),
+            self.x[indices].tolist(),
+            self.y[indices].tolist(),
+            left.tolist(),
+            top.tolist(),
+            tank_blocked[indices].tolist(),
+            obstacle_blocked[indices].tolist(),
+            reindex.tolist(),
+        ):
+            bot = self.bots[i]
+            bot.direction = bot.current_direction = DIRECTIONS[direction]
+            if is_moving:
+                bot.x, bot.y = x, y
+                bot.rect.topleft = (rect_x, rect_y)
+                if is_reindexed:
+                    self.spatial_index.update(bot, bot.rect)
+            elif tank_hit:
+                bot.tank_collisions += 1
+            elif obstacle_hit:
+                bot.obstacle_collisions += 1
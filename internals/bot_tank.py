@@ -2,16 +2,53 @@
 Bot Tanks
 """
 
-from typing import TYPE_CHECKING, List, Union, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Union, Tuple
 
 import math
 import random
 import pygame
 
+from .assets import ASSETS
+from .game_clock import GAME_CLOCK
 from .game_configs import GAME, BOT_TANK, TANK_DIRECTION
+from .render_queue import HUD, TANKS, RenderQueue
 
 if TYPE_CHECKING:
+    from .flow_field import FlowField
+    from .obstacles import ObstacleLayer
     from .player_tank import PlayerTank
+    from .spatial_hash import SpatialHash
+
+# failed random placements in a row before switching to gap filling
+SPAWN_ATTEMPTS = 30
+# tries per empty grid cell once random placement stalls
+CELL_ATTEMPTS = 4
+# pixels kept free between spawned bots
+SPAWN_GAP = 4
+# pixels kept free along the world edges, room for the health bar on top
+SPAWN_MARGIN = 20
+# health bar boxes, one per health point
+HEALTH_BOX_SIZE = 8
+HEALTH_BOX_SPACING = 2
+HEALTH_FILL_COLOR = (239, 68, 68)  # red
+HEALTH_OUTLINE_COLOR = (15, 23, 42)  # dark blue
+
+# health bar images by health, painted once and blitted every frame
+health_bars: Dict[int, pygame.Surface] = {}
+
+
+def get_health_bar(health: int) -> pygame.Surface:
+    """Image of a health bar with one box per health point."""
+    bar = health_bars.get(health)
+    if bar is None:
+        step = HEALTH_BOX_SIZE + HEALTH_BOX_SPACING
+        bar = pygame.Surface((health * step - HEALTH_BOX_SPACING, HEALTH_BOX_SIZE), pygame.SRCALPHA)
+        for i in range(health):
+            box_rect = (i * step, 0, HEALTH_BOX_SIZE, HEALTH_BOX_SIZE)
+            pygame.draw.rect(bar, HEALTH_FILL_COLOR, box_rect)
+            pygame.draw.rect(bar, HEALTH_OUTLINE_COLOR, box_rect, 2)
+        health_bars[health] = bar
+    return bar
 
 
 class BotEnemy:
@@ -24,10 +61,12 @@ class BotEnemy:
         asset: str = BOT_TANK["asset"],
         death_asset: str = BOT_TANK["asset"],
         health: int = 6,
+        spatial_index: Optional["SpatialHash"] = None,
+        obstacles: Optional["ObstacleLayer"] = None,
     ) -> None:
         self.x = x
         self.y = y
-        self.speed = 2
+        self.speed = GAME["bot_speed"]
         self.direction = "UP"
         self.initial_direction = None
         self.health = health
@@ -35,21 +74,39 @@ class BotEnemy:
 
         self.asset = asset
         self.death_asset = death_asset
-        self.img = pygame.image.load(self.asset)
-        self.img = pygame.transform.scale(self.img, BOT_TANK["size"])
+        self.img = ASSETS.get_image(self.asset, BOT_TANK["size"])
+        self.sprites = ASSETS.get_rotations(
+            self.asset, BOT_TANK["size"], TANK_DIRECTION)
         self.rect = self.img.get_rect(topleft=(self.x, self.y))
 
+        self.spatial_index = spatial_index
+        if self.spatial_index is not None:
+            self.spatial_index.insert(self, self.rect)
+        self.obstacles = obstacles
+        # moves stopped by a tank or an obstacle
+        self.tank_collisions = 0
+        self.obstacle_collisions = 0
+
     def is_colliding_tank(
         self,
         new_rect: pygame.Rect,
         tanks_list: List[Union["PlayerTank", "MovableBotTank"]]
     ) -> bool:
         """Check if tank's position will collide with other tanks."""
+        if self.spatial_index is not None:
+            # only tanks in the grid cells around new_rect can collide
+            if not self.is_alive:
+                return False
+            return self.spatial_index.find_colliding(new_rect, ignore=self) is not None
         for tank in tanks_list:
             if tank != self and self.is_alive and new_rect.colliderect(tank.rect):
                 return True
         return False
 
+    def is_blocked(self, new_rect: pygame.Rect) -> bool:
+        """Check if an obstacle stands in the tank's new position."""
+        return self.obstacles is not None and self.obstacles.is_blocked(new_rect)
+
     def move(
         self,
         direction: str,
@@ -67,50 +124,35 @@ class BotEnemy:
         new_rect = self.rect.copy()
         new_rect.topleft = (int(new_x), int(new_y))
 
-        # Ensure the new position is within screen boundaries
-        screen_width, screen_height = GAME["screen_size"]
-        is_within_screen_width = 0 <= new_x <= screen_width - self.rect.width
-        is_within_screen_height = 0 <= new_y <= screen_height - self.rect.height
-        if is_within_screen_width and is_within_screen_height:
-            # Check if the new position collides with any other tank
-            if not self.is_colliding_tank(new_rect, tanks_list):
+        # Ensure the new position is within world boundaries
+        world_width, world_height = GAME["world_size"]
+        is_within_world_width = 0 <= new_x <= world_width - self.rect.width
+        is_within_world_height = 0 <= new_y <= world_height - self.rect.height
+        if is_within_world_width and is_within_world_height:
+            # Check if the new position collides with any other tank or an obstacle
+            if self.is_colliding_tank(new_rect, tanks_list):
+                self.tank_collisions += 1
+            elif self.is_blocked(new_rect):
+                self.obstacle_collisions += 1
+            else:
                 self.x, self.y = new_x, new_y
                 self.rect.topleft = (int(self.x), int(self.y))
+                if self.spatial_index is not None:
+                    self.spatial_index.update(self, self.rect)
 
-    def draw_health_bar(self, screen: pygame.Surface) -> None:
-        """Draw the health bar with six boxes above the tank."""
-        bar_width = 8
-        bar_height = 8
-        spacing = 2
-        # center the bar above the tank
-        bar_x = self.x - (self.rect.width // 2) + \
-            (3 * (bar_width + spacing)) // 2
-        bar_y = self.y - 20  # position above the tank
-
-        fill_color = (239, 68, 68)  # red
-        outline_color = (15, 23, 42)  # dark blue
-
-        # draw the health boxes
-        for i in range(self.health):
-            box_rect = (bar_x + i * (bar_width + spacing),
-                        bar_y, bar_width, bar_height)
-            # health box
-            pygame.draw.rect(screen, fill_color, box_rect)
-            # health outline box
-            pygame.draw.rect(screen, outline_color, box_rect, 2)
-
-    def draw(self, screen: pygame.Surface) -> None:
-        """Paint the Tank"""
-        # draw the tank according to direction
-        rotated_img = pygame.transform.rotate(
-            self.img, TANK_DIRECTION[self.direction])
-        center = (self.x + self.rect.width / 2, self.y + self.rect.height / 2)
-        rotated_rect = rotated_img.get_rect(center=center)
-        screen.blit(rotated_img, rotated_rect.topleft)
-
-        if self.is_alive:
-            # display health bar above tank
-            self.draw_health_bar(screen)
+    def queue_sprites(self, render_queue: RenderQueue, viewport: Optional[pygame.Rect] = None) -> None:
+        """Queue the Tank and its health bar relative to the viewport"""
+        offset = viewport.topleft if viewport is not None else (0, 0)
+        # the pre-rotated tank image according to direction
+        img, (offset_x, offset_y) = self.sprites[self.direction]
+        render_queue.add(TANKS, img, (self.x - offset[0] + offset_x, self.y - offset[1] + offset_y))
+
+        if self.is_alive and self.health > 0:
+            # health bar centered above the tank
+            bar_x = self.x - offset[0] - (self.rect.width // 2) + \
+                (3 * (HEALTH_BOX_SIZE + HEALTH_BOX_SPACING)) // 2
+            bar_y = self.y - offset[1] - 20
+            render_queue.add(HUD, get_health_bar(self.health), (bar_x, bar_y))
 
 
 class MovableBotTank(BotEnemy):
@@ -123,7 +165,9 @@ class MovableBotTank(BotEnemy):
         asset: str = BOT_TANK["asset"],
         death_asset: str = BOT_TANK["asset"],
         health: int = 6,
-        movement_interval: int = 2_000
+        movement_interval: int = 2_000,
+        spatial_index: Optional["SpatialHash"] = None,
+        obstacles: Optional["ObstacleLayer"] = None,
     ) -> None:
         super().__init__(
             x,
@@ -131,9 +175,11 @@ class MovableBotTank(BotEnemy):
             asset=asset,
             death_asset=death_asset,
             health=health,
+            spatial_index=spatial_index,
+            obstacles=obstacles,
         )
         self.movement_interval = movement_interval
-        self.last_move_time = pygame.time.get_ticks()
+        self.last_move_time = GAME_CLOCK.get_ticks()
         self.current_direction = self.get_new_direction()
 
     def get_new_direction(self) -> str:
@@ -142,50 +188,142 @@ class MovableBotTank(BotEnemy):
 
     def move_randomly(self, tanks_list: List[Union["PlayerTank", "MovableBotTank"]]):
         """Change new tank movement, according to movement interval."""
-        current_time = pygame.time.get_ticks()
+        current_time = GAME_CLOCK.get_ticks()
         if current_time - self.last_move_time >= self.movement_interval:
             self.current_direction = self.get_new_direction()
             self.last_move_time = current_time
         self.move(self.current_direction, tanks_list)
 
+    def move_along_flow_field(
+        self,
+        flow_field: "FlowField",
+        tanks_list: List[Union["PlayerTank", "MovableBotTank"]],
+    ) -> None:
+        """Drive towards the flow field's target, wandering where it gives no direction."""
+        center_x, center_y = self.rect.center
+        direction = flow_field.get_direction(center_x, center_y)
+        if direction is None:
+            self.move_randomly(tanks_list)
+            return
 
-def generate_bots():
-    """Try to generate bots that are not overlap with each other."""
+        # keep to the middle of the tiles so turns don't clip the tile corners
+        tile_center_x, tile_center_y = flow_field.get_tile_center(center_x, center_y)
+        offset_x = tile_center_x - center_x
+        offset_y = tile_center_y - center_y
+        if direction in ("LEFT", "RIGHT") and abs(offset_y) > self.speed:
+            direction = "DOWN" if offset_y > 0 else "UP"
+        elif direction in ("UP", "DOWN") and abs(offset_x) > self.speed:
+            direction = "RIGHT" if offset_x > 0 else "LEFT"
+        self.current_direction = direction
+        self.move(direction, tanks_list)
+
+
+def find_spawn_points(
+    count: int,
+    area: pygame.Rect,
+    size: Tuple[int, int],
+    keep_out_center: Optional[Tuple[float, float]] = None,
+    keep_out_radius: float = 0.0,
+    is_blocked: Optional[Callable[[pygame.Rect], bool]] = None,
+    attempts: int = SPAWN_ATTEMPTS,
+) -> List[Tuple[int, int]]:
+    """Top left corners of up to `count` non-overlapping tanks inside the area.
+
+    Random darts are checked against a grid of tank-sized cells, which
+    hold one tank at most, so each dart only looks at 3x3 cells. Once the
+    darts keep missing, every empty cell gets a few tries of its own and
+    the remaining tanks are picked at random from the spots found.
+    """
+    cell_width = size[0] + SPAWN_GAP
+    cell_height = size[1] + SPAWN_GAP
+    max_x = area.right - size[0]
+    max_y = area.bottom - size[1]
+    if count <= 0 or max_x < area.left or max_y < area.top:
+        return []
+    columns = (max_x - area.left) // cell_width + 1
+    rows = (max_y - area.top) // cell_height + 1
+    grid = [-1] * (columns * rows)
+    points: List[Tuple[int, int]] = []
+
+    def fits(x: int, y: int) -> bool:
+        if keep_out_center is not None:
+            distance_x = x + size[0] / 2 - keep_out_center[0]
+            distance_y = y + size[1] / 2 - keep_out_center[1]
+            if distance_x * distance_x + distance_y * distance_y < keep_out_radius * keep_out_radius:
+                return False
+        if is_blocked is not None and is_blocked(pygame.Rect(x, y, size[0], size[1])):
+            return False
+        col = (x - area.left) // cell_width
+        row = (y - area.top) // cell_height
+        for near_row in range(max(0, row - 1), min(rows, row + 2)):
+            for near_col in range(max(0, col - 1), min(columns, col + 2)):
+                index = grid[near_row * columns + near_col]
+                if index >= 0:
+                    point_x, point_y = points[index]
+                    if abs(point_x - x) < cell_width and abs(point_y - y) < cell_height:
+                        return False
+        return True
+
+    def place(x: int, y: int) -> None:
+        col = (x - area.left) // cell_width
+        row = (y - area.top) // cell_height
+        grid[row * columns + col] = len(points)
+        points.append((x, y))
+
+    # random darts while the area is sparse
+    misses = 0
+    while len(points) < count and misses < attempts:
+        x = random.randint(area.left, max_x)
+        y = random.randint(area.top, max_y)
+        if fits(x, y):
+            place(x, y)
+            misses = 0
+        else:
+            misses += 1
+    if len(points) >= count or not points:
+        return points
+
+    # fill the remaining gaps cell by cell, then pick from the spots found
+    placed_count = len(points)
+    empty_cells = [cell for cell, index in enumerate(grid) if index < 0]
+    random.shuffle(empty_cells)
+    for cell in empty_cells:
+        cell_x = area.left + (cell % columns) * cell_width
+        cell_y = area.top + (cell // columns) * cell_height
+        for _ in range(CELL_ATTEMPTS):
+            x = random.randint(cell_x, min(cell_x + cell_width - 1, max_x))
+            y = random.randint(cell_y, min(cell_y + cell_height - 1, max_y))
+            if fits(x, y):
+                place(x, y)
+                break
+    extra = random.sample(points[placed_count:], min(len(points) - placed_count, count - placed_count))
+    return points[:placed_count] + extra
 
-    tank_size_w: int = BOT_TANK["size"][0]
-    tank_size_h: int = BOT_TANK["size"][1]
-    bots_count: int = GAME["bots_count"]
 
-    x_coords = (100, 900)
-    y_coords = (100, 500)
-    coordinates: List[Tuple[int, int]] = []
+def generate_bots(
+    spatial_index: Optional["SpatialHash"] = None,
+    player_center: Optional[Tuple[float, float]] = None,
+    obstacles: Optional["ObstacleLayer"] = None,
+):
+    """Generate bots that don't overlap each other, obstacles or crowd the player's spawn."""
+    bots_count: int = GAME["bots_count"]
+    world_width, world_height = GAME["world_size"]
+    area = pygame.Rect(SPAWN_MARGIN, SPAWN_MARGIN,
+                       world_width - 2 * SPAWN_MARGIN, world_height - 2 * SPAWN_MARGIN)
+    positions = find_spawn_points(
+        bots_count,
+        area,
+        BOT_TANK["size"],
+        keep_out_center=player_center,
+        keep_out_radius=GAME["spawn_keep_out"],
+        is_blocked=obstacles.is_blocked if obstacles is not None else None,
+    )
+    if len(positions) < bots_count:
+        print(f"Only room for {len(positions)} of {bots_count} bots, "
+              "make the world bigger to spawn them all")
 
     bot_tanks: List[MovableBotTank] = []
-
-    for _ in range(bots_count):
-        x = random.randint(x_coords[0], x_coords[1])
-        y = random.randint(y_coords[0], y_coords[1])
-        new_rect = pygame.Rect(x, y, tank_size_w, tank_size_h)
-
-        attempt = 0
-        max_attempts = 50  # limit the number of attempts to find a non-overlapping position
-        while attempt < max_attempts:
-            is_colliding_with_tanks = any(
-                new_rect.colliderect(
-                    pygame.Rect(cx, cy, tank_size_w, tank_size_h)
-                ) for cx, cy in coordinates
-            )
-
-            if not is_colliding_with_tanks:
-                coordinates.append((x, y))
-                break
-            attempt += 1
-
-        if attempt == max_attempts:
-            x = random.randint(x_coords[0], x_coords[1])
-            y = random.randint(y_coords[0], y_coords[1])
-            new_rect = pygame.Rect(x, y, tank_size_w, tank_size_h)
-
+    for x, y in positions:
         bot = MovableBotTank(
             x=x,
             y=y,
@@ -193,6 +331,8 @@ def generate_bots():
             asset=BOT_TANK["asset"],
             death_asset=BOT_TANK["death_asset"],
             movement_interval=random.choice(GAME["bot_intervals"]),
+            spatial_index=spatial_index,
+            obstacles=obstacles,
         )
         bot_tanks.append(bot)
 
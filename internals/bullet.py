@@ -1,41 +1,119 @@
 """
-Tank Bullet 
+Tank Bullet
 """
 
-import pygame
+from typing import Dict, Iterator, List, Tuple
 
-from .game_configs import BULLET, BULLET_DIRECTION
+from .assets import ASSETS
+from .game_configs import GAME, BULLET, BULLET_DIRECTION
+
+# unit velocity for each bullet direction
+BULLET_VELOCITY: Dict[str, Tuple[int, int]] = {
+    "UP": (0, -1),
+    "RIGHT": (1, 0),
+    "DOWN": (0, 1),
+    "LEFT": (-1, 0),
+}
 
 
 class Bullet:
     """Bullet object."""
 
+    __slots__ = ("x", "y", "speed_x", "speed_y", "speed", "img", "rect")
+
     def __init__(self, x: float, y: float, direction: str,  asset: str = BULLET["asset"]) -> None:
-        self.x = x
-        self.y = y
-        self.speed_x = 0
-        self.speed_y = 0
         self.speed = 6
+        self.reset(x, y, direction, asset)
 
-        self.img = pygame.image.load(asset)
-        self.img = pygame.transform.scale(self.img, BULLET["size"])
-        self.img = pygame.transform.rotate(
-            self.img, BULLET_DIRECTION[direction])
+    def reset(self, x: float, y: float, direction: str, asset: str = BULLET["asset"]) -> None:
+        """Reuse the bullet for a new shot."""
+        self.x = x
+        self.y = y
+        velocity_x, velocity_y = BULLET_VELOCITY[direction]
+        self.speed_x = velocity_x * self.speed
+        self.speed_y = velocity_y * self.speed
 
-        if direction == "UP":
-            self.speed_y = -6
-        if direction == "RIGHT":
-            self.speed_x = 6
-        if direction == "DOWN":
-            self.speed_y = 6
-        if direction == "LEFT":
-            self.speed_x = -6
+        self.img, _ = ASSETS.get_rotations(
+            asset, BULLET["size"], BULLET_DIRECTION)[direction]
+        self.rect = self.img.get_rect(topleft=(int(self.x), int(self.y)))
 
     def move(self) -> None:
         """Move bullet to x and y."""
         self.y += self.speed_y
         self.x += self.speed_x
+        self.rect.topleft = (int(self.x), int(self.y))
+
+    def is_in_world(self) -> bool:
+        """Check if any part of the bullet is still inside the world."""
+        world_width, world_height = GAME["world_size"]
+        rect = self.rect
+        return rect.right > 0 and rect.bottom > 0 and rect.left < world_width and rect.top < world_height
+
+
+class BulletPool:
+    """Live bullets plus a free list of spent ones to recycle for new shots."""
+
+    def __init__(
+        self,
+        bullet: type[Bullet] = Bullet,
+        asset: str = BULLET["asset"],
+        capacity: int = 32,
+    ) -> None:
+        self.bullet = bullet
+        self.live: List[Bullet] = []
+        self.free: List[Bullet] = [
+            bullet(0, 0, "UP", asset=asset) for _ in range(capacity)]
+        self.allocated = capacity
+
+    def __iter__(self) -> Iterator[Bullet]:
+        return iter(self.live)
+
+    def __len__(self) -> int:
+        return len(self.live)
+
+    @property
+    def live_count(self) -> int:
+        """Bullets currently flying."""
+        return len(self.live)
+
+    @property
+    def free_count(self) -> int:
+        """Spent bullets waiting to be reused."""
+        return len(self.free)
+
+    def spawn(self, x: float, y: float, direction: str, asset: str = BULLET["asset"]) -> Bullet:
+        """Fire a bullet, reusing a spent one when available."""
+        if self.free:
+            bullet = self.free.pop()
+            bullet.reset(x, y, direction, asset)
+        else:
+            bullet = self.bullet(x, y, direction, asset=asset)
+            self.allocated += 1
+        self.live.append(bullet)
+        return bullet
+
+    def release(self, bullet: Bullet) -> None:
+        """Return a bullet that hit something to the free list."""
+        self.live.remove(bullet)
+        self.free.append(bullet)
+
+    def update(self) -> None:
+        """Move live bullets and recycle the ones that left the world."""
+        live = self.live
+        kept = 0
+        for bullet in live:
+            bullet.move()
+            if bullet.is_in_world():
+                live[kept] = bullet
+                kept += 1
+            else:
+                self.free.append(bullet)
+        del live[kept:]
 
-    def draw(self, screen: pygame.Surface) -> None:
-        """Draw the bullet according to x and y."""
-        screen.blit(self.img, (self.x, self.y))
+    def stats(self) -> Dict[str, int]:
+        """Pool counters for monitoring."""
+        return {
+            "live": self.live_count,
+            "free": self.free_count,
+            "allocated": self.allocated,
+        }
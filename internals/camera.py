@@ -0,0 +1,37 @@
+"""
+Camera
+Viewport over a world larger than the screen.
+"""
+
+from typing import Tuple
+
+import pygame
+
+
+class Camera:
+    """Screen-sized window into the world that follows a target."""
+
+    def __init__(self, screen_size: Tuple[int, int], world_size: Tuple[int, int]) -> None:
+        self.world_size = world_size
+        # visible part of the world, in world coordinates
+        self.rect = pygame.Rect((0, 0), screen_size)
+
+    @property
+    def offset(self) -> Tuple[int, int]:
+        """World position of the screen's top left corner."""
+        return self.rect.topleft
+
+    def follow(self, target: pygame.Rect) -> None:
+        """Center on the target, without showing anything past the world edges."""
+        world_width, world_height = self.world_size
+        self.rect.center = target.center
+        self.rect.left = max(0, min(self.rect.left, world_width - self.rect.width))
+        self.rect.top = max(0, min(self.rect.top, world_height - self.rect.height))
+
+    def is_visible(self, rect: pygame.Rect) -> bool:
+        """Whether any part of the rect is on screen."""
+        return self.rect.colliderect(rect)
+
+    def to_screen(self, x: float, y: float) -> Tuple[float, float]:
+        """Screen position of a world position."""
+        return x - self.rect.left, y - self.rect.top
@@ -0,0 +1,84 @@
+"""
+Dirty rectangle rendering.
+Repaints and pushes to the display only the parts of the screen that changed.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pygame
+
+# share of the screen area past which a single full flip is cheaper
+FULL_FLIP_THRESHOLD = 0.4
+
+
+class DirtyRectRenderer:
+    """Screen rects drawn in the previous and current frame.
+
+    Last frame's rects are restored from the cached map background, then
+    both frames' rects are sent to pygame.display.update(). A full redraw
+    and flip happens on the first frame, whenever the camera moves and
+    when the dirty area passes the threshold.
+    """
+
+    def __init__(
+        self,
+        screen_size: Tuple[int, int],
+        threshold: float = FULL_FLIP_THRESHOLD,
+    ) -> None:
+        self.screen_rect = pygame.Rect((0, 0), screen_size)
+        self.threshold = threshold
+        self.previous_rects: List[pygame.Rect] = []
+        self.current_rects: List[pygame.Rect] = []
+        self.viewport: Optional[pygame.Rect] = None
+        self.is_full_redraw = True
+        self.full_flips = 0
+        self.partial_updates = 0
+
+    def invalidate(self) -> None:
+        """Redraw and flip the whole screen next frame."""
+        self.is_full_redraw = True
+
+    def begin_frame(self, viewport: pygame.Rect) -> bool:
+        """Start a frame, return whether only the dirty rects need repainting."""
+        if self.viewport != viewport:
+            # scrolling changes every pixel
+            self.viewport = viewport.copy()
+            self.is_full_redraw = True
+        self.current_rects = []
+        return not self.is_full_redraw
+
+    def add(self, rect: Optional[pygame.Rect]) -> None:
+        """Record a screen area painted this frame."""
+        if rect is None:
+            return
+        clipped = rect.clip(self.screen_rect)
+        if clipped.width and clipped.height:
+            self.current_rects.append(clipped)
+
+    def extend(self, rects: Iterable[pygame.Rect]) -> None:
+        """Record several painted screen areas."""
+        for rect in rects:
+            self.add(rect)
+
+    def present(self) -> None:
+        """Push the changed areas to the display, or flip when that is cheaper."""
+        dirty_rects = self.previous_rects + self.current_rects
+        # overlaps are counted twice, which only errs towards flipping
+        dirty_area = sum(rect.width * rect.height for rect in dirty_rects)
+        screen_area = self.screen_rect.width * self.screen_rect.height
+        if self.is_full_redraw or dirty_area > self.threshold * screen_area:
+            pygame.display.flip()
+            self.full_flips += 1
+        else:
+            pygame.display.update(dirty_rects)
+            self.partial_updates += 1
+        self.previous_rects = self.current_rects
+        self.is_full_redraw = False
+
+    def stats(self) -> Dict[str, int]:
+        """Presentation counters for monitoring."""
+        return {
+            "dirty_rects": len(self.previous_rects),
+            "full_flips": self.full_flips,
+            "partial_updates": self.partial_updates,
+        }
@@ -3,21 +3,79 @@ Game effects.
 Sound, Text, etc...
 """
 
-from typing import Tuple
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
 from datetime import datetime
 
 import pygame
 
-from .game_configs import GAME, BULLET
+from .assets import ASSETS
+from .game_configs import GAME
 from .high_scores import HighScores
 
-pygame.mixer.init()
-pygame.font.init()
+TITLE_FONT_SIZE = 74
+TEXT_FONT_SIZE = 40
 
-SHOOTING_SFX = pygame.mixer.Sound(BULLET["shooting_sfx"])
+Color = Tuple[int, int, int]
+TextKey = Tuple[str, pygame.font.Font, Color, Optional[Color]]
 
-TITLE_FONT = pygame.font.Font(GAME["font"], 74)
-TEXT_FONT = pygame.font.Font(GAME["font"], 40)
+# rendered text surfaces, least recently used evicted first
+MAX_TEXT_SURFACES = 128
+TEXT_CACHE: "OrderedDict[TextKey, pygame.Surface]" = OrderedDict()
+
+
+class CachedLayer:
+    """Full screen surface kept until the state it was built from changes."""
+
+    def __init__(self) -> None:
+        self.key: Any = None
+        self.surface: Optional[pygame.Surface] = None
+        self.position = (0, 0)
+
+    def set_surface(self, key: Any, surface: pygame.Surface) -> None:
+        """Keep only the painted part of a full screen surface."""
+        bounds = surface.get_bounding_rect()
+        self.key = key
+        self.surface = surface.subsurface(bounds).copy()
+        self.position = bounds.topleft
+
+    def is_stale(self, key: Any) -> bool:
+        """Whether the layer was built from a different state."""
+        return self.surface is None or self.key != key
+
+
+END_SCREEN_LAYER = CachedLayer()
+
+
+def render_text(
+    text: str,
+    font: pygame.font.Font,
+    color: Color,
+    outline_color: Optional[Color] = None,
+) -> pygame.Surface:
+    """Render text once, with the outline composed into the same surface."""
+    key: TextKey = (text, font, color, outline_color)
+    surface = TEXT_CACHE.get(key)
+    if surface is not None:
+        TEXT_CACHE.move_to_end(key)
+        return surface
+
+    text_surface = font.render(text, True, color)
+    if outline_color is None:
+        surface = text_surface
+    else:
+        # one pixel outline on each diagonal, the fill sits in the middle
+        outline_surface = font.render(text, True, outline_color)
+        width, height = text_surface.get_size()
+        surface = pygame.Surface((width + 2, height + 2), pygame.SRCALPHA)
+        for pos in ((0, 0), (2, 0), (0, 2), (2, 2)):
+            surface.blit(outline_surface, pos)
+        surface.blit(text_surface, (1, 1))
+
+    TEXT_CACHE[key] = surface
+    if len(TEXT_CACHE) > MAX_TEXT_SURFACES:
+        TEXT_CACHE.popitem(last=False)
+    return surface
 
 
 def draw_text_with_outline(
@@ -29,37 +87,31 @@ def draw_text_with_outline(
     screen: pygame.Surface,
 ):
     """Text with outline renderer."""
-    outline_positions = [
-        (position[0] - 1, position[1] - 1),
-        (position[0] + 1, position[1] - 1),
-        (position[0] - 1, position[1] + 1),
-        (position[0] + 1, position[1] + 1),
-    ]
-    for pos in outline_positions:
-        outline_surface = font.render(text, True, outline_color)
-        screen.blit(outline_surface, pos)
-    text_surface = font.render(text, True, color)
-    screen.blit(text_surface, position)
+    surface = render_text(text, font, color, outline_color)
+    # the composed surface has a one pixel outline border
+    screen.blit(surface, (position[0] - 1, position[1] - 1))
 
 
-def draw_game_end_message(
-    screen: pygame.Surface,
+def build_game_end_layer(
     elapsed_time: float,
     high_scores: HighScores,
-):
-    """End game with final message."""
+) -> pygame.Surface:
+    """Compose the end screen texts into one transparent layer."""
+    layer = pygame.Surface(GAME["screen_size"], pygame.SRCALPHA)
+    title_font = ASSETS.get_font(GAME["font"], TITLE_FONT_SIZE)
+    text_font = ASSETS.get_font(GAME["font"], TEXT_FONT_SIZE)
 
     # show winning screen
-    text_surface = TITLE_FONT.render("You Won!", True, (0, 0, 128))
+    text_surface = render_text("You Won!", title_font, (0, 0, 128))
     text_rect = text_surface.get_rect(
         center=(GAME["screen_size"][0] // 2, GAME["screen_size"][1] // 2 - 100))
-    screen.blit(text_surface, text_rect)
+    layer.blit(text_surface, text_rect)
 
     time_text = f"Your score: {elapsed_time:.2f} seconds"
-    time_surface = TITLE_FONT.render(time_text, True, (0, 0, 128))
+    time_surface = render_text(time_text, title_font, (0, 0, 128))
     time_rect = time_surface.get_rect(
         center=(GAME["screen_size"][0] // 2, GAME["screen_size"][1] // 2 + - 40))
-    screen.blit(time_surface, time_rect)
+    layer.blit(time_surface, time_rect)
 
     # list high scores
     for i, high_score in enumerate(high_scores):
@@ -72,10 +124,26 @@ def draw_game_end_message(
         high_score_text = f"{label_text} : {score_text}"
         draw_text_with_outline(
             text=high_score_text,
-            font=TEXT_FONT,
+            font=text_font,
             color=(255, 255, 255),
             outline_color=(60, 60, 60),
             position=(GAME["screen_size"][0] // 4,
                       GAME["screen_size"][1] // 2 + 40 + i * 30),
-            screen=screen,
+            screen=layer,
         )
+    return layer
+
+
+def draw_game_end_message(
+    screen: pygame.Surface,
+    elapsed_time: float,
+    high_scores: HighScores,
+) -> pygame.Rect:
+    """End game with final message, return the painted area."""
+    # rebuild the layer only when the score or the score list changes
+    key = (elapsed_time, tuple(
+        (entry["score"], entry["timestamp"]) for entry in high_scores))
+    if END_SCREEN_LAYER.is_stale(key):
+        END_SCREEN_LAYER.set_surface(
+            key, build_game_end_layer(elapsed_time, high_scores))
+    return screen.blit(END_SCREEN_LAYER.surface, END_SCREEN_LAYER.position)
@@ -0,0 +1,156 @@
+"""
+Explosions
+Explosion animations and smoke puffs played from a fixed pool of slots.
+"""
+
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+from .assets import ASSETS
+from .game_clock import GAME_CLOCK
+from .game_configs import EXPLOSION
+from .render_queue import EFFECTS, RenderQueue
+
+# an image and the blit offset that centers it on the effect's position
+Frame = Tuple[pygame.Surface, Tuple[int, int]]
+
+# kinds of effect a slot plays, indexes of EffectPool.frames
+EXPLOSION_EFFECT = 0
+SMOKE_EFFECT = 1
+
+# where an explosion's smoke puffs start, around its center
+SMOKE_OFFSETS = [(-8, -4), (7, -6), (0, 8)]
+
+
+def get_explosion_frames() -> List[Frame]:
+    """Explosion images scaled by EXPLOSION["scale"]."""
+    frames: List[Frame] = []
+    for path in EXPLOSION["assets"]:
+        width, height = ASSETS.get_image(path).get_size()
+        size = (int(width * EXPLOSION["scale"]), int(height * EXPLOSION["scale"]))
+        frames.append((ASSETS.get_image(path, size), (-(size[0] // 2), -(size[1] // 2))))
+    return frames
+
+
+def get_smoke_frames() -> List[Frame]:
+    """Smoke puff images, growing and fading out frame by frame."""
+    size = EXPLOSION["smoke_size"]
+    count = EXPLOSION["smoke_frames"]
+    frames: List[Frame] = []
+    for i in range(count):
+        progress = i / count
+        img = pygame.Surface((size, size), pygame.SRCALPHA)
+        color = (*EXPLOSION["smoke_color"], int(160 * (1 - progress)))
+        pygame.draw.circle(img, color, (size // 2, size // 2), int(size / 4 * (1 + progress)))
+        if pygame.display.get_surface() is not None:
+            img = img.convert_alpha()
+        frames.append((img, (-(size // 2), -(size // 2))))
+    return frames
+
+
+class EffectPool:
+    """Effects playing in a fixed number of slots.
+
+    The state of a slot is a few numbers in flat arrays (kind, position
+    and start time), so starting an effect fills in a free slot and
+    nothing is allocated however many play at once. The frame to show
+    follows from the effect's age, and frames are scaled once up front.
+    """
+
+    def __init__(self, capacity: int = EXPLOSION["capacity"]) -> None:
+        self.capacity = capacity
+        self.kinds = array("B", bytes(capacity))
+        self.xs = array("f", bytes(4 * capacity))
+        self.ys = array("f", bytes(4 * capacity))
+        self.starts = array("q", bytes(8 * capacity))
+        # slots in the order their effects started, and the unused ones
+        self.live: List[int] = []
+        self.free: List[int] = list(range(capacity - 1, -1, -1))
+
+        self.frames: List[List[Frame]] = [get_explosion_frames(), get_smoke_frames()]
+        self.frame_times = [EXPLOSION["frame_time"], EXPLOSION["smoke_frame_time"]]
+        self.durations = [
+            len(frames) * frame_time for frames, frame_time in zip(self.frames, self.frame_times)]
+        # effects farther than this past the screen edge are not drawn
+        self.margin = max(max(img.get_width(), img.get_height())
+                          for frames in self.frames for img, _ in frames)
+
+        self.started = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self.live)
+
+    def start(self, kind: int, x: float, y: float) -> bool:
+        """Play an effect centered on a world position, False when the pool is full."""
+        if not self.free:
+            self.dropped += 1
+            return False
+        slot = self.free.pop()
+        self.kinds[slot] = kind
+        self.xs[slot] = x
+        self.ys[slot] = y
+        self.starts[slot] = GAME_CLOCK.get_ticks()
+        self.live.append(slot)
+        self.started += 1
+        return True
+
+    def explode(self, x: float, y: float) -> None:
+        """An explosion with smoke rising from it."""
+        self.start(EXPLOSION_EFFECT, x, y)
+        for offset_x, offset_y in SMOKE_OFFSETS:
+            self.start(SMOKE_EFFECT, x + offset_x, y + offset_y)
+
+    def puff(self, x: float, y: float) -> None:
+        """A single smoke puff."""
+        self.start(SMOKE_EFFECT, x, y)
+
+    def update(self) -> None:
+        """Free the slots of finished effects."""
+        now = GAME_CLOCK.get_ticks()
+        live = self.live
+        kinds = self.kinds
+        starts = self.starts
+        durations = self.durations
+        kept = 0
+        for slot in live:
+            if now - starts[slot] < durations[kinds[slot]]:
+                live[kept] = slot
+                kept += 1
+            else:
+                self.free.append(slot)
+        del live[kept:]
+
+    def queue_sprites(self, render_queue: RenderQueue, viewport: Optional[pygame.Rect] = None) -> None:
+        """Queue the current frame of every effect inside the viewport."""
+        offset_x, offset_y = viewport.topleft if viewport is not None else (0, 0)
+        screen_width, screen_height = viewport.size if viewport is not None else (0, 0)
+        now = GAME_CLOCK.get_ticks()
+        rise = EXPLOSION["smoke_rise"] / 1_000
+        margin = self.margin
+        kinds = self.kinds
+        xs = self.xs
+        ys = self.ys
+        starts = self.starts
+        for slot in self.live:
+            kind = kinds[slot]
+            age = max(0, now - starts[slot])
+            frames = self.frames[kind]
+            img, (frame_x, frame_y) = frames[min(age // self.frame_times[kind], len(frames) - 1)]
+            x = xs[slot] - offset_x + frame_x
+            y = ys[slot] - offset_y + frame_y
+            if kind == SMOKE_EFFECT:
+                y -= age * rise
+            if viewport is not None and not (-margin < x < screen_width and -margin < y < screen_height):
+                continue
+            render_queue.add(EFFECTS, img, (x, y))
+
+    def stats(self) -> Dict[str, int]:
+        """Effect counters for monitoring."""
+        return {
+            "effects": len(self.live),
+            "effects_started": self.started,
+            "effects_dropped": self.dropped,
+        }
@@ -0,0 +1,153 @@
+"""
+Flow field
+One shortest-path field over the tile grid, shared by every bot chasing the same target.
+"""
+
+from array import array
+from typing import Iterator, List, Optional, Tuple
+
+from .game_configs import TILE, TILE_COSTS
+
+TileMap = List[List[str]]
+
+# direction codes are 1 + the index in this list, 0 means "no direction"
+DIRECTIONS = ["UP", "DOWN", "LEFT", "RIGHT"]
+# tile cost of impassable tiles
+BLOCKED = 0
+UNREACHED = 0xFFFFFFFF
+# tiles settled per tick, a search over a big world is spread over a few ticks
+NODES_PER_TICK = 2_048
+
+
+def get_tile_cost(tile_type: str) -> int:
+    """Cost of driving across a tile."""
+    if "road" in tile_type:
+        return TILE_COSTS["road"]
+    if tile_type.startswith("sand"):
+        return TILE_COSTS["sand"]
+    return TILE_COSTS["grass"]
+
+
+class FlowField:
+    """Direction towards the target for every tile, from a single search.
+
+    The field is searched again (Dial's algorithm, tile costs are small
+    integers) only when the target moves to another tile or a tile cost
+    changes. This is not an incremental repair: a search always starts
+    from scratch. Moving the target by one tile changes the distance of
+    nearly every tile, so there is no small region to repair. Instead,
+    the search is spread over ticks, a budget of tiles per tick, while
+    bots keep following the previous field. Then the new field replaces
+    it.
+    """
+
+    def __init__(self, tile_map: TileMap, nodes_per_tick: int = NODES_PER_TICK) -> None:
+        self.rows = len(tile_map)
+        self.columns = len(tile_map[0]) if self.rows else 0
+        self.costs = bytearray(
+            get_tile_cost(tile_type) for tiles in tile_map for tile_type in tiles)
+        self.nodes_per_tick = nodes_per_tick
+
+        size = self.rows * self.columns
+        self.distances = array("I", [UNREACHED]) * size
+        self.directions = bytearray(size)
+        self.target: Optional[int] = None
+        self.search: Optional[Iterator[None]] = None
+        self.searches = 0
+
+    def get_tile(self, x: float, y: float) -> Optional[int]:
+        """Index of the tile under a world position, None outside the grid."""
+        col = int(x) // TILE["size"][0]
+        row = int(y) // TILE["size"][1]
+        if 0 <= col < self.columns and 0 <= row < self.rows:
+            return row * self.columns + col
+        return None
+
+    def get_tile_center(self, x: float, y: float) -> Tuple[int, int]:
+        """World position of the center of the tile under a world position."""
+        tile_width, tile_height = TILE["size"]
+        return (int(x) // tile_width * tile_width + tile_width // 2,
+                int(y) // tile_height * tile_height + tile_height // 2)
+
+    def get_direction(self, x: float, y: float) -> Optional[str]:
+        """Direction to drive from a world position, None when there is none."""
+        tile = self.get_tile(x, y)
+        if tile is None:
+            return None
+        code = self.directions[tile]
+        return DIRECTIONS[code - 1] if code else None
+
+    def set_target(self, x: float, y: float) -> None:
+        """Point the field at a world position, searching again from scratch if its tile changed."""
+        tile = self.get_tile(x, y)
+        if tile is not None and tile != self.target:
+            self.target = tile
+            self.search = self.expand(tile)
+
+    def set_cost(self, row: int, col: int, cost: int) -> None:
+        """Change a tile cost (BLOCKED for impassable), searching again."""
+        self.costs[row * self.columns + col] = cost
+        if self.target is not None:
+            self.search = self.expand(self.target)
+
+    def update(self) -> None:
+        """Run the pending search for one tick's budget."""
+        if self.search is not None:
+            next(self.search, None)
+
+    def finish(self) -> None:
+        """Run the pending search to the end."""
+        while self.search is not None:
+            self.update()
+
+    def expand(self, target: int) -> Iterator[None]:
+        """Search outwards from the target, pausing every nodes_per_tick tiles."""
+        columns = self.columns
+        costs = self.costs
+        distances = array("I", [UNREACHED]) * len(costs)
+        directions = bytearray(len(costs))
+        distances[target] = 0
+
+        # buckets of tiles by distance, reused round robin (Dial's algorithm)
+        bucket_count = max(costs) + 1
+        buckets: List[List[int]] = [[] for _ in range(bucket_count)]
+        buckets[0].append(target)
+        pending = 1
+        distance = 0
+        settled = 0
+        while pending:
+            bucket = buckets[distance % bucket_count]
+            while bucket:
+                tile = bucket.pop()
+                pending -= 1
+                if distances[tile] != distance:
+                    continue  # stale entry, the tile was reached cheaper
+                settled += 1
+                if settled % self.nodes_per_tick == 0:
+                    yield
+
+                row, col = divmod(tile, columns)
+                # neighbours drive towards this tile: DOWN, UP, RIGHT, LEFT
+                for neighbour, code, is_inside in (
+                    (tile - columns, 2, row > 0),
+                    (tile + columns, 1, row < self.rows - 1),
+                    (tile - 1, 4, col > 0),
+                    (tile + 1, 3, col < columns - 1),
+                ):
+                    if not is_inside:
+                        continue
+                    cost = costs[neighbour]
+                    if cost == BLOCKED:
+                        continue
+                    new_distance = distance + cost
+                    if new_distance < distances[neighbour]:
+                        distances[neighbour] = new_distance
+                        directions[neighbour] = code
+                        buckets[new_distance % bucket_count].append(neighbour)
+                        pending += 1
+            distance += 1
+
+        self.distances = distances
+        self.directions = directions
+        self.search = None
+        self.searches += 1
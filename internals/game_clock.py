@@ -0,0 +1,44 @@
+"""
+Game clock
+Game time in milliseconds, read from the wall clock or from a tick counter.
+"""
+
+from typing import Optional
+
+import pygame
+
+
+class GameClock:
+    """Source of game time for cooldowns, bot intervals and score timers."""
+
+    def __init__(self) -> None:
+        self.tick_ms: Optional[float] = None
+        self.tick = 0
+
+    @property
+    def is_fixed_step(self) -> bool:
+        """Whether time is driven by the tick counter."""
+        return self.tick_ms is not None
+
+    def use_fixed_step(self, fps: int = 60) -> None:
+        """Advance game time by a fixed step per tick, independent of real time."""
+        self.tick_ms = 1_000 / fps
+        self.tick = 0
+
+    def use_wall_clock(self) -> None:
+        """Follow pygame's real time clock."""
+        self.tick_ms = None
+        self.tick = 0
+
+    def advance(self) -> None:
+        """Move to the next tick."""
+        self.tick += 1
+
+    def get_ticks(self) -> int:
+        """Milliseconds of game time, like pygame.time.get_ticks()."""
+        if self.tick_ms is None:
+            return pygame.time.get_ticks()
+        return int(self.tick * self.tick_ms)
+
+
+GAME_CLOCK = GameClock()
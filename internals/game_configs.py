@@ -4,10 +4,49 @@ Game configurations.
 
 GAME = {
     "screen_size": (64 * 15, 64 * 10),
+    # size of the playing field, the camera scrolls when it exceeds the screen
+    "world_size": (64 * 15, 64 * 10),
     "background": (0, 0, 0),
     "font": "assets/fonts/jersey_10/jersey10.ttf",
     "bots_count": 30,
     "bot_intervals": [1_000, 1_200, 800, 500, 300],
+    # pixels per tick
+    "player_speed": 2,
+    "bot_speed": 2,
+    # seconds counted down before a windowed match starts, 0 to skip
+    "countdown": 3,
+    # no bot spawns closer than this (pixels) to the player
+    "spawn_keep_out": 150,
+    # "random" bots wander, "flow_field" bots chase the player along the cheapest tiles
+    "bot_ai": "random",
+    # share of the tiles off the roads with an obstacle, 0 for an open map
+    "obstacle_density": 0.04,
+    # move all bots in one vectorized NumPy step (needs numpy)
+    "batched_bots": False,
+    # repaint and update only the screen areas that changed, flip when most of it did
+    "dirty_rects": False,
+    # tanks leave fading track marks while they drive
+    "trails": True,
+    # generate the map instead of using MAP, None picks a new seed every match
+    "random_map": False,
+    "map_seed": None,
+}
+
+PROFILER = {
+    "enabled": False,
+    "show_overlay": False,  # toggle in game with F3
+    "output": None,  # path of a .jsonl or .csv file for per-frame samples
+    "window": 120,  # frames kept for the rolling averages and histograms
+}
+
+REPLAY = {
+    "record": None,  # path to save the match's input recording to
+    "seed": None,  # seed of the match, None picks a random one
+}
+
+ASSET_BUNDLE = {
+    # written by --pack-assets, images load from their PNGs while it is missing
+    "path": "assets/images.bundle",
 }
 
 BULLET = {
@@ -23,6 +62,36 @@ BULLET_DIRECTION = {
     "RIGHT": 270,
 }
 
+SOUND = {
+    "channels": 16,  # mixer channels reserved for sound effects
+    "max_distance": 960,  # pixels from the player at which sounds fade out
+    # priority: higher takes channels from lower, limit: plays per window (ms),
+    # samples without a file are a burst of noise of `noise` milliseconds
+    "samples": {
+        "shot": {
+            "path": BULLET["shooting_sfx"],
+            "volume": 1.0,
+            "priority": 2,
+            "limit": 4,
+            "window": 100,
+        },
+        "explosion": {
+            "noise": 600,
+            "volume": 0.8,
+            "priority": 3,
+            "limit": 3,
+            "window": 100,
+        },
+        "hit": {
+            "noise": 80,
+            "volume": 0.4,
+            "priority": 1,
+            "limit": 2,
+            "window": 100,
+        },
+    },
+}
+
 PLAYER_TANK = {
     "asset": "assets/imgs/tanks/tank_blue.png",
     "death_asset": "assets/imgs/tanks/tank_blue_body.png",
@@ -44,6 +113,18 @@ TANK_DIRECTION = {
     "LEFT": 270,
 }
 
+TRAIL = {
+    # track image and scale for each tank image, scaled like the tank sprites
+    "tracks": {
+        PLAYER_TANK["asset"]: ("assets/imgs/tanks/tracks_large.png", 0.5),
+        BOT_TANK["asset"]: ("assets/imgs/tanks/tracks_small.png", 0.4),
+    },
+    "lifetime": 3_000,  # milliseconds until a track mark has faded out
+    "fade_interval": 250,  # milliseconds between two fading steps
+    # pixels, marks are kept in square chunks around the viewport
+    "chunk_size": 256,
+}
+
 TILES = {
     # grass tiles
     "grass_1": "tile_grass_1.png",
@@ -92,6 +173,50 @@ TILES = {
     "sand_road_SplitW": "tile_sand_road_SplitW.png",
 }
 
+OBSTACLE = {
+    "assets": "assets/imgs/obsticles",
+    "scale": 0.5,  # same scale as the tank sprites, every obstacle fits in a tile
+    # bullet hits each obstacle kind takes
+    "health": {
+        "barrel_black_side": 1,
+        "barrel_green_side": 1,
+        "barrel_red_side": 1,
+        "barrel_rust_side": 1,
+        "barricade_metal": 4,
+        "barricade_wood": 2,
+        "crate_metal": 4,
+        "crate_wood": 2,
+        "fence_red": 2,
+        "fence_yellow": 2,
+        "sandbag_beige": 3,
+        "sandbag_brown": 3,
+        "tree_brown_large": 6,
+        "tree_brown_small": 3,
+        "tree_green_large": 6,
+        "tree_green_small": 3,
+    },
+}
+
+EXPLOSION = {
+    "assets": [f"assets/imgs/effects/explosion_{i}.png" for i in range(1, 6)],
+    "scale": 0.5,  # explosion frames are drawn at half their file size
+    "frame_time": 60,  # milliseconds each explosion frame shows
+    # smoke puffs drawn as grey circles that grow and fade out
+    "smoke_size": 24,
+    "smoke_frames": 8,
+    "smoke_frame_time": 80,
+    "smoke_rise": 20,  # pixels per second
+    "smoke_color": (90, 90, 90),
+    "capacity": 1_024,  # effects playing at once, more are dropped
+}
+
+# cost of driving across a tile for bots chasing the player
+TILE_COSTS = {
+    "road": 1,
+    "grass": 2,
+    "sand": 3,
+}
+
 TILE = {
     "asset": "assets/imgs/tiles/tile_grass_1.png",
     "size": (64, 64),
@@ -2,100 +2,124 @@
 Run the game in life-cycle.
 """
 
-from typing import List, Union
+import time
+from typing import Optional
 
 import pygame
 
-from .game_configs import GAME, PLAYER_TANK
-from .player_tank import PlayerTank
-from .bot_tank import generate_bots, MovableBotTank, has_player_won
-from .high_scores import load_high_scores, get_best_high_score, save_high_scores
-from .map_generator import draw_map
+from .assets import ASSETS, AssetPreloader
+from .game_clock import GAME_CLOCK
+from .game_configs import GAME, REPLAY
+from .game_session import GameSession
+from .player_input import KeyboardInput
+from .high_scores import get_high_score_store, MAX_RECORDS
 from .effects import draw_game_end_message
+from .profiler import FrameProfiler
+from .dirty_rects import DirtyRectRenderer
+from .replay import Replay
+from .sound import SOUNDS
+from .loading_screen import LoadingScreen, get_match_images
 
 
 def game_life_cycle():
     """Runs the game in life-cycle."""
+    start_time = time.perf_counter()
 
-    pygame.init()
+    pygame.display.init()
 
     # initialize base game
     clock = pygame.time.Clock()
     screen = pygame.display.set_mode(GAME["screen_size"])
 
+    # decode the images in the background behind the loading screen
+    loading_screen = LoadingScreen(screen, start_time)
+    preloader = AssetPreloader(ASSETS, get_match_images())
+    preloader.start()
+    if not loading_screen.show_progress(clock, preloader):
+        pygame.quit()
+        return
+
     # generate game characters
-    player_tank = PlayerTank(
-        x=480,
-        y=320,
-        asset=PLAYER_TANK["asset"],
-        death_asset=PLAYER_TANK["death_asset"],
-        bullet_asset=PLAYER_TANK["bullet_asset"],
-        reload_time=300,
-    )
-    bot_tanks: List["MovableBotTank"] = generate_bots()
-    all_tanks: List[Union["PlayerTank", "MovableBotTank"]] = [player_tank]
-    all_tanks.extend(bot_tanks)
+    profiler = FrameProfiler.from_config()
+    recording: Optional[Replay] = None
+    if REPLAY["record"] is not None:
+        # recorded runs follow the tick counter, so a replay sees the same times
+        GAME_CLOCK.use_fixed_step(60)
+    session = GameSession(profiler=profiler, seed=REPLAY["seed"])
+    if REPLAY["record"] is not None:
+        recording = Replay(session.seed)
+    input_source = KeyboardInput()
+    dirty_rects = DirtyRectRenderer(GAME["screen_size"]) if GAME["dirty_rects"] else None
+    # synthesizing sounds on the first explosion would stall that frame
+    SOUNDS.prepare()
+    is_game_running = loading_screen.show_countdown(clock, session, dirty_rects)
+    session.restart_timer()
+    profiler.report_startup(loading_screen.timings)
 
     # generate high score timer records
     is_high_score_saved = False
-    high_scores = load_high_scores()
-    best_high_score = float(get_best_high_score(high_scores)["score"])
-    start_timer = pygame.time.get_ticks()
-    end_timer: Union[int, None] = None
+    high_score_store = get_high_score_store()
+    high_scores = high_score_store.latest(MAX_RECORDS)
+    best_high_score = float(high_score_store.best()["score"])
 
-    is_game_running = True
     while is_game_running:
+        profiler.begin_frame()
         for event in pygame.event.get():
             if event.type is pygame.QUIT:
                 is_game_running = False
-
-        is_player_won = has_player_won(bot_tanks)
-
-        # """Process player tank actions."""
-        player_pressed_keys = pygame.key.get_pressed()
-        if not is_player_won:
-            player_tank.move_on_keypress(player_pressed_keys, all_tanks)
-            if player_pressed_keys[pygame.K_SPACE]:
-                player_tank.shoot()
-            player_tank.process_bullet_collision(all_tanks)
-
-        # """Map rendering"""
-        screen.fill(GAME["background"])  # fill background color
-        draw_map(screen)
-
-        # """Render all tanks"
-        for tank in all_tanks:
-            # move bots in random movements
-            if isinstance(tank, MovableBotTank):
-                tank.move_randomly(all_tanks)
-            # paint all tanks on screen
-            tank.draw(screen)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle_overlay()
+            if event.type == pygame.WINDOWEXPOSED and dirty_rects is not None:
+                dirty_rects.invalidate()
+
+        keys = input_source.get_pressed(session)
+        if recording is not None:
+            recording.record(keys)
+        profiler.mark("input")
+        session.update(keys)
+        session.draw(screen, dirty_rects)
 
         # """Game finished"""
-        if is_player_won:
-            elapsed_time = 0.0
-
-            if end_timer is None:
-                end_timer = pygame.time.get_ticks()
-
-            if start_timer and end_timer:
-                time_diff = end_timer - start_timer
-                # convert milliseconds to seconds
-                elapsed_time = time_diff / 1_000
-
-                if elapsed_time < best_high_score:
-                    best_high_score = elapsed_time
-                if not is_high_score_saved:
-                    is_high_score_saved = True
-                    save_high_scores(elapsed_time)
-
-            draw_game_end_message(
+        if session.is_player_won:
+            elapsed_time = session.elapsed_time
+
+            if elapsed_time < best_high_score:
+                best_high_score = elapsed_time
+            if not is_high_score_saved:
+                is_high_score_saved = True
+                # written by a background thread, no hitch on this frame
+                high_score_store.add(elapsed_time)
+                high_scores = high_score_store.latest(MAX_RECORDS)
+
+            end_screen_rect = draw_game_end_message(
                 screen=screen,
                 elapsed_time=elapsed_time,
                 high_scores=high_scores
             )
-
-        pygame.display.flip()  # paint the screen
+            if dirty_rects is not None:
+                dirty_rects.add(end_screen_rect)
+        profiler.mark("end_screen")
+
+        if profiler.enabled:
+            overlay_rect = profiler.draw_overlay(screen)
+            if dirty_rects is not None:
+                dirty_rects.add(overlay_rect)
+            profiler.mark("overlay")
+
+        if dirty_rects is not None:
+            dirty_rects.present()  # paint the changed areas
+        else:
+            pygame.display.flip()  # paint the screen
+        profiler.mark("flip")
         clock.tick(60)  # cap FPS at 60
-
+        profiler.mark("idle")
+        if profiler.enabled:
+            profiler.end_frame({**session.entity_counts(), **SOUNDS.stats()})
+
+    if recording is not None:
+        recording.state_hash = session.state_hash()
+        recording.save(REPLAY["record"])
+        GAME_CLOCK.use_wall_clock()
+    profiler.close()
+    high_score_store.close()
     pygame.quit()
@@ -0,0 +1,269 @@
+"""
+Game session.
+One match worth of tanks and timers, advanced one tick at a time.
+"""
+
+import random
+import hashlib
+from typing import Dict, List, Optional, Union
+
+import pygame
+
+from .game_clock import GAME_CLOCK
+from .game_configs import GAME, PLAYER_TANK, TILE, MAP
+from .player_tank import PlayerTank
+from .bot_tank import generate_bots, MovableBotTank, has_player_won
+from .bot_swarm import BotSwarm, is_available as is_bot_swarm_available
+from .camera import Camera
+from .flow_field import BLOCKED, FlowField, get_tile_cost
+from .dirty_rects import DirtyRectRenderer
+from .map_generator import ChunkedMapRenderer, MapGenerator, MapRenderer, is_fixed_map
+from .explosions import EffectPool
+from .obstacles import ObstacleLayer, place_obstacles
+from .render_queue import RenderQueue
+from .trails import TrailLayer
+from .sound import SOUNDS
+from .spatial_hash import SpatialHash
+from .player_input import KeyState
+from .profiler import FrameProfiler
+
+# pixels drawn above a tank for its health bar
+HEALTH_BAR_MARGIN = 20
+
+
+class GameSession:
+    """Game state and per-tick logic shared by windowed and headless runs."""
+
+    def __init__(
+        self,
+        profiler: Optional[FrameProfiler] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        if profiler is None:
+            profiler = FrameProfiler()
+        self.profiler = profiler
+
+        # one seed drives bot spawns, bot movement and the generated map
+        if seed is None:
+            seed = random.randrange(1 << 32)
+        self.seed = seed
+        random.seed(seed)
+
+        # the fixed MAP covers one screen, bigger worlds are generated in chunks;
+        # MAP is shared, not copied, so cells edited in it at runtime are repainted
+        world_width, world_height = GAME["world_size"]
+        self.map_renderer: Union[MapRenderer, ChunkedMapRenderer] = MapRenderer(MAP)
+        if not is_fixed_map():
+            self.map_renderer = ChunkedMapRenderer(
+                MapGenerator(GAME["map_seed"] if GAME["map_seed"] is not None else seed),
+                GAME["world_size"])
+        self.camera = Camera(GAME["screen_size"], GAME["world_size"])
+        tile_width, tile_height = TILE["size"]
+        self.tile_map = self.map_renderer.get_tile_map(
+            -(-world_width // tile_width), -(-world_height // tile_height))
+
+        # generate game characters, indexed by grid cell for collision checks
+        self.tank_index = SpatialHash()
+        self.player_tank = PlayerTank(
+            x=world_width // 2,
+            y=world_height // 2,
+            asset=PLAYER_TANK["asset"],
+            death_asset=PLAYER_TANK["death_asset"],
+            bullet_asset=PLAYER_TANK["bullet_asset"],
+            reload_time=300,
+            spatial_index=self.tank_index,
+        )
+
+        self.obstacles: Optional[ObstacleLayer] = None
+        if GAME["obstacle_density"] > 0:
+            self.obstacles = place_obstacles(
+                self.tile_map,
+                GAME["obstacle_density"],
+                keep_out_center=self.player_tank.rect.center,
+                keep_out_radius=GAME["spawn_keep_out"],
+            )
+            self.player_tank.obstacles = self.obstacles
+            self.map_renderer.obstacles = self.obstacles
+
+        self.bot_tanks: List["MovableBotTank"] = generate_bots(
+            spatial_index=self.tank_index,
+            player_center=self.player_tank.rect.center,
+            obstacles=self.obstacles,
+        )
+        self.all_tanks: List[Union["PlayerTank", "MovableBotTank"]] = [
+            self.player_tank]
+        self.all_tanks.extend(self.bot_tanks)
+
+        self.camera.follow(self.player_tank.rect)
+        self.tanks_drawn = 0
+        # sprites are queued by layer and painted together at the end of draw()
+        self.render_queue = RenderQueue()
+        self.effects = EffectPool()
+        self.player_tank.effects = self.effects
+        self.trails: Optional[TrailLayer] = None
+        if GAME["trails"]:
+            self.trails = TrailLayer()
+            self.map_renderer.decals = self.trails
+
+        # one shared path search steers every chasing bot
+        self.flow_field: Optional[FlowField] = None
+        if GAME["bot_ai"] == "flow_field":
+            self.flow_field = FlowField(self.tile_map)
+            if self.obstacles is not None:
+                for obstacle in self.obstacles.obstacles:
+                    self.flow_field.set_cost(obstacle.row, obstacle.col, BLOCKED)
+            self.flow_field.set_target(*self.player_tank.rect.center)
+            self.flow_field.finish()
+
+        self.bot_swarm: Optional[BotSwarm] = None
+        if GAME["batched_bots"]:
+            if is_bot_swarm_available():
+                self.bot_swarm = BotSwarm(self.bot_tanks, seed=seed)
+            else:
+                print("numpy is not installed, bots move one by one")
+
+        self.tick = 0
+        self.is_player_won = False
+        self.start_timer = GAME_CLOCK.get_ticks()
+        self.end_timer: Optional[int] = None
+
+    def restart_timer(self) -> None:
+        """Time the match from now on, once the count-down is over."""
+        self.start_timer = GAME_CLOCK.get_ticks()
+
+    @property
+    def elapsed_time(self) -> float:
+        """Seconds from the start of the match until the win (or until now)."""
+        end_timer = self.end_timer
+        if end_timer is None:
+            end_timer = GAME_CLOCK.get_ticks()
+        # convert milliseconds to seconds
+        return (end_timer - self.start_timer) / 1_000
+
+    def update(self, keys: KeyState) -> None:
+        """Advance the game logic by one tick."""
+        self.is_player_won = has_player_won(self.bot_tanks)
+
+        # """Process player tank actions."""
+        player_tank = self.player_tank
+        if not self.is_player_won:
+            player_tank.move_on_keypress(keys, self.all_tanks)
+            if keys[pygame.K_SPACE]:
+                player_tank.shoot()
+            player_tank.process_bullet_collision(self.all_tanks)
+            self.clear_destroyed_obstacles()
+        player_tank.update_bullets()
+        self.effects.update()
+        self.camera.follow(player_tank.rect)
+        SOUNDS.set_listener(player_tank.rect.center)
+        self.profiler.mark("player")
+
+        # move bots in random movements, or after the player
+        flow_field = self.flow_field
+        if flow_field is not None:
+            flow_field.set_target(*player_tank.rect.center)
+            flow_field.update()
+        if self.bot_swarm is not None:
+            self.bot_swarm.step(GAME_CLOCK.get_ticks(), self.all_tanks, flow_field)
+        else:
+            for tank in self.all_tanks:
+                if not isinstance(tank, MovableBotTank):
+                    continue
+                if flow_field is not None:
+                    tank.move_along_flow_field(flow_field, self.all_tanks)
+                else:
+                    tank.move_randomly(self.all_tanks)
+        self.profiler.mark("bots_update")
+
+        if self.is_player_won and self.end_timer is None:
+            self.end_timer = GAME_CLOCK.get_ticks()
+
+        self.tick += 1
+        if GAME_CLOCK.is_fixed_step:
+            GAME_CLOCK.advance()
+
+    def clear_destroyed_obstacles(self) -> None:
+        """Repaint the tiles of destroyed obstacles and open them up for bots."""
+        if self.obstacles is None:
+            return
+        for obstacle in self.obstacles.pop_destroyed():
+            self.map_renderer.refresh_tile(obstacle.row, obstacle.col)
+            if self.flow_field is not None:
+                self.flow_field.set_cost(
+                    obstacle.row, obstacle.col, get_tile_cost(self.tile_map[obstacle.row][obstacle.col]))
+
+    def draw(self, screen: pygame.Surface, dirty_rects: Optional[DirtyRectRenderer] = None) -> None:
+        """Paint the map and the tanks inside the camera viewport.
+
+        With a dirty rect renderer only the areas painted last frame are
+        restored from the map background, instead of the whole screen.
+        """
+        viewport = self.camera.rect
+        # """Track marks of the tanks around the viewport"""
+        stamped_rects: List[pygame.Rect] = []
+        if self.trails is not None:
+            nearby_tanks = self.tank_index.query(self.trails.get_area(viewport))
+            if self.trails.update(nearby_tanks, viewport) and dirty_rects is not None:
+                # fading changes every mark on screen
+                dirty_rects.invalidate()
+            stamped_rects = self.trails.take_stamped_rects(viewport)
+
+        # """Map rendering"""
+        if dirty_rects is not None and dirty_rects.begin_frame(viewport):
+            dirty_rects.extend(stamped_rects)
+            dirty_rects.extend(self.map_renderer.restore(
+                screen, viewport, dirty_rects.previous_rects + stamped_rects))
+        else:
+            screen.fill(GAME["background"])  # fill background color
+            self.map_renderer.draw(screen, viewport)
+        self.profiler.mark("map")
+
+        # """Render visible tanks"
+        # the margin keeps health bars of tanks just past the edges
+        visible_tanks = self.tank_index.query(viewport.inflate(0, 2 * HEALTH_BAR_MARGIN))
+        for tank in visible_tanks:
+            tank.queue_sprites(self.render_queue, viewport)
+        self.tanks_drawn = len(visible_tanks)
+        self.effects.queue_sprites(self.render_queue, viewport)
+        painted = self.render_queue.flush(screen)
+        if dirty_rects is not None:
+            dirty_rects.extend(painted)
+        self.profiler.mark("bots_draw")
+
+    def state_hash(self) -> str:
+        """Digest of the match state, equal for runs that played out the same."""
+        state = [self.tick, GAME_CLOCK.get_ticks(), self.is_player_won, self.end_timer]
+        for tank in [self.player_tank] + self.bot_tanks:
+            state.append((tank.x, tank.y, tank.direction, tank.health, tank.is_alive))
+        for bullet in self.player_tank.bullets:
+            state.append((bullet.x, bullet.y, bullet.speed_x, bullet.speed_y))
+        if self.obstacles is not None:
+            state.append([obstacle.health for obstacle in self.obstacles.obstacles])
+        return hashlib.blake2b(repr(state).encode(), digest_size=8).hexdigest()
+
+    def collision_counts(self) -> Dict[str, int]:
+        """Moves stopped by tanks or obstacles, and bullet hits, so far."""
+        tanks = [self.player_tank, *self.bot_tanks]
+        return {
+            "tank_collisions": sum(tank.tank_collisions for tank in tanks),
+            "obstacle_collisions": sum(tank.obstacle_collisions for tank in tanks),
+            "bullet_hits": self.player_tank.bullet_hits,
+        }
+
+    def entity_counts(self) -> Dict[str, int]:
+        """Entity and bullet counts for the profiler."""
+        bullets = self.player_tank.bullets
+        counts = {
+            "tanks": len(self.all_tanks),
+            "tanks_drawn": self.tanks_drawn,
+            **self.render_queue.stats(),
+            "bots_alive": sum(1 for bot in self.bot_tanks if bot.is_alive),
+            "bullets": bullets.live_count,
+            "bullets_free": bullets.free_count,
+        }
+        counts.update(self.effects.stats())
+        if self.trails is not None:
+            counts.update(self.trails.stats())
+        if self.obstacles is not None:
+            counts.update(self.obstacles.stats())
+        return counts
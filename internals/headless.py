@@ -0,0 +1,97 @@
+"""
+Headless simulation.
+Runs the game logic without a window, sound device or frame cap.
+"""
+
+import os
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Union
+
+import pygame
+
+from .game_clock import GAME_CLOCK
+from .game_configs import GAME
+from .game_session import GameSession
+from .player_input import AutoPilotInput, InputSource
+from .sound import SOUNDS
+
+if TYPE_CHECKING:
+    from .replay import Replay
+
+SimulationReport = Dict[str, Union[int, float, bool, None]]
+
+SIMULATION_FPS = 60
+MAX_TICKS = SIMULATION_FPS * 60 * 10  # give up after ten minutes of game time
+
+
+def use_dummy_drivers() -> None:
+    """Point SDL at its dummy video and audio drivers, and turn the game sounds off."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    SOUNDS.is_enabled = False
+
+
+def start_simulation() -> pygame.Surface:
+    """Set up a run of the game logic without a window or sound, return its screen."""
+    use_dummy_drivers()
+    # the mixer and the fonts start on first use, a simulation needs neither
+    pygame.display.init()
+    # a (dummy) display lets the asset registry convert surfaces as usual
+    screen = pygame.display.set_mode(GAME["screen_size"])
+    GAME_CLOCK.use_fixed_step(SIMULATION_FPS)
+    return screen
+
+
+def run_headless(
+    input_source: Optional[InputSource] = None,
+    max_ticks: int = MAX_TICKS,
+    render: bool = False,
+    seed: Optional[int] = None,
+    recording: Optional["Replay"] = None,
+) -> SimulationReport:
+    """Play one match as fast as possible and report how it went.
+
+    Pass a recording (an empty Replay) to have the inputs recorded into it.
+    """
+    screen = start_simulation()
+
+    session = GameSession(seed=seed)
+    if recording is not None:
+        recording.seed = session.seed
+    if input_source is None:
+        input_source = AutoPilotInput()
+
+    start_time = time.perf_counter()
+    while not session.is_player_won and session.tick < max_ticks:
+        keys = input_source.get_pressed(session)
+        if recording is not None:
+            recording.record(keys)
+        session.update(keys)
+        if render:
+            session.draw(screen)
+    wall_time = time.perf_counter() - start_time
+    if recording is not None:
+        recording.state_hash = session.state_hash()
+
+    GAME_CLOCK.use_wall_clock()
+    return {
+        "seed": session.seed,
+        "ticks": session.tick,
+        "wall_time": wall_time,
+        "ticks_per_second": session.tick / wall_time if wall_time else 0.0,
+        "won": session.is_player_won,
+        "time_to_win": session.elapsed_time if session.is_player_won else None,
+        **session.collision_counts(),
+    }
+
+
+def print_report(report: SimulationReport) -> None:
+    """Print a simulation report."""
+    print(f"Ticks: {report['ticks']}")
+    print(f"Ticks/sec: {report['ticks_per_second']:.0f}")
+    if report["won"]:
+        print(f"Time to win: {report['time_to_win']:.2f} seconds (game time)")
+    else:
+        print("Time to win: not won before the tick limit")
+    print(f"Collisions: {report['tank_collisions']} tank, "
+          f"{report['obstacle_collisions']} obstacle, {report['bullet_hits']} bullet hits")
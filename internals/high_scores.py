@@ -4,46 +4,176 @@ HighScore recorder
 
 import os
 import json
+import queue
+import bisect
+import tempfile
+import threading
 
 from datetime import datetime
-from typing import cast, Dict, Union, List
+from typing import cast, Dict, Union, List, Optional, Tuple
 
 HighScoreEntry = Dict[str, Union[float, str]]
 HighScores = List[HighScoreEntry]
 
 HIGH_SCORE_FILE = "high_scores.json"
-MAX_RECORDS = 5
+MAX_RECORDS = 5  # records shown on the end screen
+MAX_STORED_RECORDS = 10_000  # records kept on disk, oldest dropped first
+
+
+class HighScoreStore:
+    """All recorded runs kept in memory, persisted by a background writer.
+
+    Every save replaces the file atomically (temp file + rename), so a
+    crash mid-write leaves the previous file intact.
+    """
+
+    def __init__(
+        self,
+        path: str = HIGH_SCORE_FILE,
+        max_stored_records: int = MAX_STORED_RECORDS,
+    ) -> None:
+        self.path = path
+        self.max_stored_records = max_stored_records
+        # runs in the order they were recorded, oldest first
+        self.records: HighScores = []
+        # (score, timestamp) of every run, best score first
+        self.score_index: List[Tuple[float, str]] = []
+
+        self.lock = threading.Lock()
+        self.pending: "queue.Queue[Optional[HighScores]]" = queue.Queue()
+        self.worker: Optional[threading.Thread] = None
+        self.load()
+
+    def load(self) -> None:
+        """Read the records saved by previous runs."""
+        records: HighScores = []
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as file:
+                try:
+                    data = json.load(file)
+                    records = cast(HighScores, data.get("high_scores", []))
+                except json.JSONDecodeError as e:
+                    print("Invalid JSON syntax:", e)
+
+        records = sorted(records, key=lambda entry: entry["timestamp"])
+        with self.lock:
+            self.records = records[-self.max_stored_records:]
+            self.score_index = sorted(
+                (float(entry["score"]), str(entry["timestamp"])) for entry in self.records)
+
+    def add(self, new_score: float) -> HighScoreEntry:
+        """Record a run and queue the file write, without blocking."""
+        new_entry: HighScoreEntry = {
+            "score": new_score,
+            "timestamp": datetime.now().isoformat(),
+        }
+        with self.lock:
+            self.records.append(new_entry)
+            bisect.insort(self.score_index, (new_score, str(new_entry["timestamp"])))
+            while len(self.records) > self.max_stored_records:
+                oldest = self.records.pop(0)
+                index_key = (float(oldest["score"]), str(oldest["timestamp"]))
+                del self.score_index[bisect.bisect_left(self.score_index, index_key)]
+            snapshot = list(self.records)
+
+        self.pending.put(snapshot)
+        self.start_worker()
+        return new_entry
+
+    def best(self) -> HighScoreEntry:
+        """Best (lowest) score, or a zero score if nothing is recorded."""
+        with self.lock:
+            if self.score_index:
+                score, timestamp = self.score_index[0]
+                return {"score": score, "timestamp": timestamp}
+        return {"score": 0.0, "timestamp": ""}
+
+    def top(self, count: int = MAX_RECORDS) -> HighScores:
+        """Best scores first."""
+        with self.lock:
+            return [{"score": score, "timestamp": timestamp}
+                    for score, timestamp in self.score_index[:count]]
+
+    def latest(self, count: int = MAX_RECORDS) -> HighScores:
+        """Most recent runs first."""
+        with self.lock:
+            return list(reversed(self.records[-count:]))
+
+    def start_worker(self) -> None:
+        """Start the background writer on first use."""
+        if self.worker is None or not self.worker.is_alive():
+            self.worker = threading.Thread(
+                target=self.write_pending, name="high-score-writer", daemon=True)
+            self.worker.start()
+
+    def write_pending(self) -> None:
+        """Background writer loop, a None in the queue stops it."""
+        while True:
+            snapshot = self.pending.get()
+            # only the newest snapshot matters when several saves queued up
+            is_stopping = snapshot is None
+            while not self.pending.empty():
+                queued = self.pending.get_nowait()
+                self.pending.task_done()
+                if queued is None:
+                    is_stopping = True
+                else:
+                    snapshot = queued
+            if snapshot is not None:
+                self.write(snapshot)
+            self.pending.task_done()
+            if is_stopping:
+                return
+
+    def write(self, records: HighScores) -> None:
+        """Replace the high score file atomically."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        file_descriptor, temp_path = tempfile.mkstemp(
+            prefix=".high_scores.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                json.dump({"high_scores": list(reversed(records))},
+                          file, separators=(",", ":"))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+        except (OSError, TypeError) as e:
+            print("Unable to save high scores:", e)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def flush(self) -> None:
+        """Wait for queued writes to reach the disk."""
+        if self.worker is not None and self.worker.is_alive():
+            self.pending.join()
+
+    def close(self) -> None:
+        """Finish queued writes and stop the background writer."""
+        if self.worker is not None and self.worker.is_alive():
+            self.pending.put(None)
+            self.worker.join()
+        self.worker = None
+
+
+HIGH_SCORE_STORE: Optional[HighScoreStore] = None
+
+
+def get_high_score_store() -> HighScoreStore:
+    """Shared store, loaded from disk on first use."""
+    global HIGH_SCORE_STORE  # pylint: disable=global-statement
+    if HIGH_SCORE_STORE is None:
+        HIGH_SCORE_STORE = HighScoreStore()
+    return HIGH_SCORE_STORE
 
 
 def load_high_scores() -> HighScores:
-    """Load all highscores"""
-    if os.path.exists(HIGH_SCORE_FILE):
-        with open(HIGH_SCORE_FILE, "r", encoding="utf-8") as file:
-            try:
-                data = json.load(file)
-                return cast(HighScores, data.get("high_scores", []))
-            except json.JSONDecodeError as e:
-                print("Invalid JSON syntax:", e)
-    return []
+    """Load the latest highscores"""
+    return get_high_score_store().latest(MAX_RECORDS)
 
 
 def save_high_scores(new_score: float):
-    """Save high score record in json file"""
-    high_scores = load_high_scores()
-    new_entry: HighScoreEntry = {
-        "score": new_score,
-        "timestamp": datetime.now().isoformat(),
-    }
-    high_scores.append(new_entry)
-    # record only latest records no more than MAX_RECORDS
-    high_scores = sorted(
-        high_scores, key=lambda entry: entry["timestamp"], reverse=True)[:MAX_RECORDS]
-
-    with open(HIGH_SCORE_FILE, "w", encoding="utf-8") as file:
-        try:
-            json.dump({"high_scores": high_scores}, file, indent=4)
-        except TypeError:
-            print("Unable to serialize the object")
+    """Save high score record in json file (in the background)"""
+    get_high_score_store().add(new_score)
 
 
 def get_best_high_score(high_scores: HighScores) -> HighScoreEntry:
@@ -0,0 +1,111 @@
+"""
+Loading screen.
+Progress bar while the match's images decode in the background, then a
+count-down over the first frame of the match.
+"""
+
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import pygame
+
+from .assets import ASSETS, AssetPreloader
+from .effects import render_text, TITLE_FONT_SIZE
+from .game_configs import GAME, BOT_TANK, EXPLOSION, MAP, OBSTACLE, PLAYER_TANK, TILES, TRAIL
+from .map_generator import is_fixed_map
+
+if TYPE_CHECKING:
+    from .dirty_rects import DirtyRectRenderer
+    from .game_session import GameSession
+
+BAR_SIZE = (320, 16)
+BAR_COLOR = (255, 255, 255)
+
+
+def get_match_images() -> List[str]:
+    """Image files a match needs before its first frame."""
+    images = [PLAYER_TANK["asset"], PLAYER_TANK["bullet_asset"], BOT_TANK["asset"], *EXPLOSION["assets"]]
+    if is_fixed_map():
+        tile_types = sorted({tile_type for tiles in MAP for tile_type in tiles})
+    else:
+        tile_types = sorted(TILES)
+    images.extend(f"assets/imgs/tiles/{TILES[tile_type]}" for tile_type in tile_types)
+    if GAME["obstacle_density"] > 0:
+        images.extend(f"{OBSTACLE['assets']}/{kind}.png" for kind in OBSTACLE["health"])
+    if GAME["trails"]:
+        images.extend(path for path, _ in TRAIL["tracks"].values())
+    return images
+
+
+def is_quit_requested() -> bool:
+    """Drain the event queue, return whether the window was closed."""
+    return any(event.type == pygame.QUIT for event in pygame.event.get())
+
+
+class LoadingScreen:
+    """Startup screens, timed from the moment the game started."""
+
+    def __init__(self, screen: pygame.Surface, start_time: float) -> None:
+        self.screen = screen
+        self.start_time = start_time
+        # milliseconds from the start to each startup step
+        self.timings: Dict[str, float] = {}
+
+    def mark(self, step: str) -> None:
+        """Record the time a startup step finished, once."""
+        self.timings.setdefault(step, (time.perf_counter() - self.start_time) * 1_000)
+
+    def draw_progress(self, progress: float) -> None:
+        """Paint the loading text and bar."""
+        self.screen.fill(GAME["background"])
+        center_x = GAME["screen_size"][0] // 2
+        center_y = GAME["screen_size"][1] // 2
+        text = render_text("Loading", ASSETS.get_font(GAME["font"], TITLE_FONT_SIZE), BAR_COLOR)
+        self.screen.blit(text, text.get_rect(midbottom=(center_x, center_y - 8)))
+
+        bar = pygame.Rect((0, 0), BAR_SIZE)
+        bar.midtop = (center_x, center_y + 8)
+        pygame.draw.rect(self.screen, BAR_COLOR, bar, width=1)
+        filled = bar.inflate(-4, -4)
+        filled.width = int(filled.width * progress)
+        pygame.draw.rect(self.screen, BAR_COLOR, filled)
+
+    def show_progress(self, clock: pygame.time.Clock, preloader: AssetPreloader) -> bool:
+        """Show the bar until the preloader is done, False if the window was closed."""
+        while True:
+            if is_quit_requested():
+                return False
+            is_done = preloader.is_done
+            self.draw_progress(preloader.progress)
+            pygame.display.flip()
+            self.mark("first_frame")
+            if is_done:
+                self.mark("assets_ready")
+                return True
+            clock.tick(60)
+
+    def show_countdown(
+        self,
+        clock: pygame.time.Clock,
+        session: "GameSession",
+        dirty_rects: Optional["DirtyRectRenderer"] = None,
+    ) -> bool:
+        """Count down over the frozen first frame, False if the window was closed."""
+        self.mark("match_ready")
+        font = ASSETS.get_font(GAME["font"], TITLE_FONT_SIZE * 2)
+        end_time = time.perf_counter() + GAME["countdown"]
+        while True:
+            seconds_left = end_time - time.perf_counter()
+            if seconds_left <= 0:
+                break
+            if is_quit_requested():
+                return False
+            session.draw(self.screen)
+            text = render_text(str(int(seconds_left) + 1), font, BAR_COLOR, (0, 0, 0))
+            self.screen.blit(text, text.get_rect(
+                center=(GAME["screen_size"][0] // 2, GAME["screen_size"][1] // 2)))
+            pygame.display.flip()
+            clock.tick(60)
+        if dirty_rects is not None:
+            dirty_rects.invalidate()
+        return True
@@ -2,19 +2,551 @@
 Generate game map
 """
 
+import random
+from array import array
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
 import pygame
 
-from .game_configs import TILE, TILES, MAP
+from .assets import ASSETS
+from .game_configs import GAME, TILE, TILES, MAP
+
+if TYPE_CHECKING:
+    from .obstacles import ObstacleLayer
+    from .trails import TrailLayer
+
+TileMap = List[List[str]]
+
+
+class MapRenderer:
+    """Tile map baked once into a background surface."""
+
+    def __init__(self, tile_map: TileMap = MAP) -> None:
+        self.tile_map = tile_map
+        self.baked_map: TileMap = []
+        self.background: Optional[pygame.Surface] = None
+        self.dirty_tiles: Set[Tuple[int, int]] = set()
+        # obstacles are baked into the background with their tiles
+        self.obstacles: Optional["ObstacleLayer"] = None
+        # track marks are painted over the background, never baked into it
+        self.decals: Optional["TrailLayer"] = None
+
+    def get_tile_image(self, tile_type: str) -> pygame.Surface:
+        """Get the shared tile image for a tile type."""
+        return ASSETS.get_image(
+            f"assets/imgs/tiles/{TILES[tile_type]}", TILE["size"])
+
+    def get_tile_map(self, columns: int, rows: int) -> TileMap:
+        """Tile types of the top left columns x rows cells."""
+        return [tiles[:columns] for tiles in self.tile_map[:rows]]
+
+    def bake(self) -> None:
+        """Compose the whole tile grid into the background surface."""
+        rows = len(self.tile_map)
+        cols = len(self.tile_map[0]) if rows else 0
+        background = pygame.Surface(
+            (cols * TILE["size"][0], rows * TILE["size"][1]))
+        # match the display pixel format so per-frame blits are plain copies
+        if pygame.display.get_surface() is not None:
+            background = background.convert()
+        self.background = background
+
+        self.baked_map = [row[:] for row in self.tile_map]
+        for row, tiles in enumerate(self.baked_map):
+            for col, tile_type in enumerate(tiles):
+                self.draw_tile(row, col, tile_type)
+        self.dirty_tiles.clear()
+
+    def draw_tile(self, row: int, col: int, tile_type: str) -> None:
+        """Paint a single tile onto the background surface."""
+        if self.background is None:
+            return
+        pos_x = col * TILE["size"][0]
+        pos_y = row * TILE["size"][1]
+        self.background.blit(self.get_tile_image(tile_type), (pos_x, pos_y))
+        if self.obstacles is not None:
+            self.obstacles.draw_cell(self.background, row, col)
+
+    def set_tile(self, row: int, col: int, tile_type: str) -> None:
+        """Change a map cell and queue only that tile for rebaking."""
+        self.tile_map[row][col] = tile_type
+        self.dirty_tiles.add((row, col))
+
+    def refresh_tile(self, row: int, col: int) -> None:
+        """Queue a tile for repainting, after its obstacle changed."""
+        self.dirty_tiles.add((row, col))
+
+    def sync(self) -> None:
+        """Find cells edited directly in the tile map since the last bake."""
+        for row, tiles in enumerate(self.tile_map):
+            baked_row = self.baked_map[row]
+            # whole-row comparison is cheap, only walk rows that changed
+            if tiles == baked_row:
+                continue
+            for col, tile_type in enumerate(tiles):
+                if tile_type != baked_row[col]:
+                    self.dirty_tiles.add((row, col))
+
+    def rebuild_dirty_tiles(self) -> List[pygame.Rect]:
+        """Repaint queued tiles without rebaking the whole map, return their areas."""
+        tile_width, tile_height = TILE["size"]
+        rebuilt: List[pygame.Rect] = []
+        for row, col in self.dirty_tiles:
+            tile_type = self.tile_map[row][col]
+            self.baked_map[row][col] = tile_type
+            self.draw_tile(row, col, tile_type)
+            rebuilt.append(pygame.Rect(col * tile_width, row * tile_height, tile_width, tile_height))
+        self.dirty_tiles.clear()
+        return rebuilt
+
+    def draw(self, screen: pygame.Surface, viewport: Optional[pygame.Rect] = None) -> None:
+        """Blit the cached background (or the viewport's part of it), rebaking edited tiles first."""
+        if self.background is None or len(self.baked_map) != len(self.tile_map):
+            self.bake()
+        else:
+            self.sync()
+            if self.dirty_tiles:
+                self.rebuild_dirty_tiles()
+        screen.blit(self.background, (0, 0), area=viewport)
+        if self.decals is not None and viewport is not None:
+            self.decals.draw(screen, viewport)
+
+    def restore(
+        self,
+        screen: pygame.Surface,
+        viewport: pygame.Rect,
+        rects: List[pygame.Rect],
+    ) -> List[pygame.Rect]:
+        """Repaint screen rects from the background, return the edited tiles' screen rects too."""
+        if self.background is None:
+            self.bake()
+        self.sync()
+        edited = [rect.move(-viewport.left, -viewport.top)
+                  for rect in self.rebuild_dirty_tiles()]
+        for rect in rects + edited:
+            screen.blit(self.background, rect, area=rect.move(viewport.topleft))
+            if self.decals is not None:
+                self.decals.draw_area(screen, viewport, rect)
+        return edited
+
+
+MAP_RENDERER = MapRenderer(MAP)
 
 
 def draw_map(screen: pygame.Surface) -> None:
     """Draw the map on screen."""
-    for row, _ in enumerate(MAP):
-        for col, _ in enumerate(MAP[row]):
-            tile_type = MAP[row][col]
-            tile_asset = TILES[tile_type]
-            img = pygame.image.load(f"assets/imgs/tiles/{tile_asset}")
-            img = pygame.transform.scale(img, TILE["size"])
-            pos_x = col * TILE["size"][0]
-            pos_y = row * TILE["size"][1]
-            screen.blit(img, (pos_x, pos_y))
+    MAP_RENDERER.draw(screen)
+
+
+def is_fixed_map() -> bool:
+    """Whether matches play on MAP, which covers one screen, instead of a generated map."""
+    world_width, world_height = GAME["world_size"]
+    is_world_in_map = (world_width <= len(MAP[0]) * TILE["size"][0]
+                       and world_height <= len(MAP) * TILE["size"][1])
+    return is_world_in_map and not GAME["random_map"]
+
+
+# road connections of a tile, one bit per side
+NORTH, EAST, SOUTH, WEST = 1, 2, 4, 8
+
+ROAD_TILES = {
+    NORTH | SOUTH: "road_North",
+    EAST | WEST: "road_East",
+    NORTH | EAST: "road_CornerUR",
+    NORTH | WEST: "road_CornerUL",
+    SOUTH | EAST: "road_CornerLR",
+    SOUTH | WEST: "road_CornerLL",
+    NORTH | EAST | SOUTH: "road_SplitE",
+    NORTH | SOUTH | WEST: "road_SplitW",
+    EAST | SOUTH | WEST: "road_SplitS",
+    NORTH | EAST | WEST: "road_SplitN",
+    NORTH | EAST | SOUTH | WEST: "road_Crossing",
+}
+
+# cell code bits above the four road bits
+IS_SAND = 16
+SAND_TO_EAST = 32
+SAND_TO_WEST = 64
+IS_ODD_COLUMN = 128
+IS_VARIANT = 256
+
+# Roads follow a lattice of BLOCK x BLOCK cells. Horizontal roads run in
+# rows 2..6 of a block and only jog up/down in column 0, vertical roads run
+# in columns 3..5 and only jog sideways in row 0. Grass/sand borders sit
+# between columns 1 and 2 of every other block. These phases never overlap,
+# so every cell only ever needs a tile that exists in TILES.
+BLOCK = 8
+TERRAIN_BAND = 2 * BLOCK
+TERRAIN_OFFSET = 2
+ROAD_DENSITY = 0.35  # chance of an extra horizontal road besides every third one
+SPAN_DENSITY = 0.7  # chance of a vertical road between two horizontal ones
+SAND_SHARE = 0.5
+CHUNK_SIZE = 16
+
+HASH_MASK = (1 << 64) - 1
+
+
+def hash_unit(seed: int, *values: int) -> float:
+    """Deterministic pseudo random number in [0, 1) for the given values."""
+    value = seed & HASH_MASK
+    for item in values:
+        value = ((value ^ (item & HASH_MASK)) * 0x9E3779B97F4A7C15) & HASH_MASK
+        value ^= value >> 29
+        value = (value * 0xBF58476D1CE4E5B9) & HASH_MASK
+        value ^= value >> 32
+    return value / (1 << 64)
+
+
+def build_tile_lookup() -> List[str]:
+    """Tile name for every cell code."""
+    lookup: List[str] = [""] * (IS_VARIANT * 2)
+    for code in range(IS_VARIANT * 2):
+        roads = code & 15
+        terrain = "sand" if code & IS_SAND else "grass"
+        if roads and roads not in ROAD_TILES:
+            continue  # dead ends never get generated
+        if roads == (NORTH | EAST | SOUTH | WEST) and code & IS_VARIANT:
+            name = f"{terrain}_road_CrossingRound"
+        elif roads:
+            name = f"{terrain}_{ROAD_TILES[roads]}"
+        else:
+            name = f"{terrain}_{2 if code & IS_ODD_COLUMN else 1}"
+
+        # grass tiles fade into sand neighbours, sand tiles need no transition
+        if not code & IS_SAND and code & (SAND_TO_EAST | SAND_TO_WEST):
+            side = "E" if code & SAND_TO_EAST else "W"
+            if roads == (EAST | WEST):
+                dirt = "_dirt" if code & IS_VARIANT else ""
+                name = f"grass_road_Transition{side}{dirt}"
+            elif not roads:
+                name = f"grass_transition{side}"
+        lookup[code] = name
+    return lookup
+
+
+TILE_LOOKUP = build_tile_lookup()
+
+
+class MapGenerator:
+    """Seeded, chunkable generator of valid tile layouts from TILES.
+
+    Every cell only depends on the seed and its world coordinates, so
+    any region (or chunk) can be generated on its own and matches its
+    neighbours.
+    """
+
+    def __init__(self, seed: Optional[int] = None) -> None:
+        if seed is None:
+            seed = random.randrange(1 << 32)
+        self.seed = seed
+        self.road_rows: Dict[Tuple[int, int], int] = {}
+
+    def is_sand(self, col: int) -> bool:
+        """Terrain of a column."""
+        band = (col - TERRAIN_OFFSET) // TERRAIN_BAND
+        return hash_unit(self.seed, 1, band) < SAND_SHARE
+
+    def has_road(self, band: int) -> bool:
+        """Whether a row band carries a horizontal road (every third always does)."""
+        return band % 3 == 0 or hash_unit(self.seed, 2, band) < ROAD_DENSITY
+
+    def road_row(self, band: int, block: int) -> int:
+        """Row of a horizontal road inside one column block."""
+        key = (band, block)
+        row = self.road_rows.get(key)
+        if row is None:
+            jitter = int(hash_unit(self.seed, 3, band, block) * 5) - 2
+            row = band * BLOCK + BLOCK // 2 + jitter
+            self.road_rows[key] = row
+        return row
+
+    def road_col(self, block: int, band: int) -> int:
+        """Column of a vertical road inside one row band."""
+        jitter = int(hash_unit(self.seed, 4, block, band) * 3) - 1
+        return block * BLOCK + BLOCK // 2 + jitter
+
+    def upper_road_band(self, band: int) -> int:
+        """Closest band at or above `band` with a horizontal road."""
+        while not self.has_road(band):
+            band -= 1
+        return band
+
+    def has_span(self, block: int, band: int) -> bool:
+        """Whether a vertical road runs down from the horizontal road of `band`."""
+        return hash_unit(self.seed, 5, block, band) < SPAN_DENSITY
+
+    def generate_region(self, left: int, top: int, columns: int, rows: int) -> TileMap:
+        """Tile names for the cells of a world region."""
+        codes = array("H", bytes(2 * columns * rows))
+
+        def connect(col: int, row: int, sides: int) -> None:
+            if left <= col < left + columns and top <= row < top + rows:
+                codes[(row - top) * columns + (col - left)] |= sides
+
+        self.add_horizontal_roads(left, top, columns, rows, connect)
+        self.add_vertical_roads(left, top, columns, rows, connect)
+
+        # terrain, transitions and tile variants per column
+        column_bits = []
+        for col in range(left, left + columns):
+            bits = IS_ODD_COLUMN if col % 2 else 0
+            if self.is_sand(col):
+                bits |= IS_SAND
+            else:
+                if self.is_sand(col + 1):
+                    bits |= SAND_TO_EAST
+                if self.is_sand(col - 1):
+                    bits |= SAND_TO_WEST
+            column_bits.append(bits)
+
+        tile_map: TileMap = []
+        for y in range(rows):
+            row_codes = codes[y * columns:(y + 1) * columns]
+            row = top + y
+            tile_map.append([
+                TILE_LOOKUP[code | column_bits[x] | (
+                    IS_VARIANT if hash_unit(self.seed, 6, left + x, row) < 0.25 else 0)]
+                if code else TILE_LOOKUP[column_bits[x]]
+                for x, code in enumerate(row_codes)
+            ])
+        return tile_map
+
+    def add_horizontal_roads(self, left: int, top: int, columns: int, rows: int, connect) -> None:
+        """Horizontal roads, jogging up or down at the start of column blocks."""
+        for band in range(top // BLOCK - 1, (top + rows) // BLOCK + 1):
+            if not self.has_road(band):
+                continue
+            for col in range(left, left + columns):
+                block = col // BLOCK
+                row = self.road_row(band, block)
+                previous_row = self.road_row(band, block - 1)
+                if col % BLOCK or previous_row == row:
+                    connect(col, row, EAST | WEST)
+                    continue
+                step = 1 if row > previous_row else -1
+                connect(col, previous_row, WEST | (SOUTH if step > 0 else NORTH))
+                for jog_row in range(previous_row + step, row, step):
+                    connect(col, jog_row, NORTH | SOUTH)
+                connect(col, row, EAST | (NORTH if step > 0 else SOUTH))
+
+    def add_vertical_roads(self, left: int, top: int, columns: int, rows: int, connect) -> None:
+        """Vertical roads between horizontal ones, jogging sideways at the top of row bands."""
+        for block in range(left // BLOCK - 1, (left + columns) // BLOCK + 1):
+            for row in range(top, top + rows):
+                band = row // BLOCK
+                col = self.road_col(block, band)
+                is_road_row = self.has_road(band) and row == self.road_row(band, block)
+                if is_road_row:
+                    # T-junction or crossing with the horizontal road
+                    goes_up = self.has_span(block, self.upper_road_band(band - 1))
+                    goes_down = self.has_span(block, band)
+                else:
+                    upper_band = band
+                    if self.has_road(band) and row < self.road_row(band, block):
+                        upper_band = band - 1
+                    goes_up = goes_down = self.has_span(block, self.upper_road_band(upper_band))
+
+                previous_col = self.road_col(block, band - 1)
+                if row % BLOCK == 0 and previous_col != col and goes_up:
+                    step = 1 if col > previous_col else -1
+                    connect(previous_col, row, NORTH | (EAST if step > 0 else WEST))
+                    for jog_col in range(previous_col + step, col, step):
+                        connect(jog_col, row, EAST | WEST)
+                    connect(col, row, SOUTH | (WEST if step > 0 else EAST))
+                    continue
+                connect(col, row, (NORTH if goes_up else 0) | (SOUTH if goes_down else 0))
+
+    def generate_chunk(self, chunk_x: int, chunk_y: int, chunk_size: int = CHUNK_SIZE) -> TileMap:
+        """Tile names of one chunk of the world."""
+        return self.generate_region(
+            chunk_x * chunk_size, chunk_y * chunk_size, chunk_size, chunk_size)
+
+
+def generate_map(
+    columns: int = len(MAP[0]),
+    rows: int = len(MAP),
+    seed: Optional[int] = None,
+) -> TileMap:
+    """Generate a random map layout, reproducible for a given seed."""
+    return MapGenerator(seed).generate_region(0, 0, columns, rows)
+
+
+class ChunkedMapRenderer:
+    """Endless generated map, baked in chunks around the viewport.
+
+    Chunks near the viewport are generated and baked on demand, chunks
+    far away are dropped. Tile edits are kept apart so they survive a
+    chunk being dropped and baked again.
+    """
+
+    def __init__(
+        self,
+        generator: MapGenerator,
+        world_size: Tuple[int, int],
+        chunk_size: int = CHUNK_SIZE,
+        keep_distance: int = 2,
+    ) -> None:
+        self.generator = generator
+        self.chunk_size = chunk_size
+        self.chunk_pixels = (chunk_size * TILE["size"][0], chunk_size * TILE["size"][1])
+        # chunks covering the world, the last row and column may be cut short
+        self.chunk_count = (
+            -(-world_size[0] // self.chunk_pixels[0]),
+            -(-world_size[1] // self.chunk_pixels[1]),
+        )
+        # chunks further than this (in chunks) from the visible ones are dropped
+        self.keep_distance = keep_distance
+        self.chunks: Dict[Tuple[int, int], pygame.Surface] = {}
+        self.chunk_maps: Dict[Tuple[int, int], TileMap] = {}
+        self.edits: Dict[Tuple[int, int], str] = {}
+        # world rects of tiles edited since the last restore()
+        self.edited_rects: List[pygame.Rect] = []
+        # obstacles are baked into the chunks with their tiles
+        self.obstacles: Optional["ObstacleLayer"] = None
+        # track marks are painted over the chunks, never baked into them
+        self.decals: Optional["TrailLayer"] = None
+        self.baked_count = 0
+        self.evicted_count = 0
+
+    def get_tile_image(self, tile_type: str) -> pygame.Surface:
+        """Get the shared tile image for a tile type."""
+        return ASSETS.get_image(
+            f"assets/imgs/tiles/{TILES[tile_type]}", TILE["size"])
+
+    def get_chunk_range(self, viewport: pygame.Rect) -> Tuple[int, int, int, int]:
+        """First and last chunk columns and rows covered by the viewport."""
+        chunk_width, chunk_height = self.chunk_pixels
+        return (
+            max(0, viewport.left // chunk_width),
+            max(0, viewport.top // chunk_height),
+            min(self.chunk_count[0] - 1, (viewport.right - 1) // chunk_width),
+            min(self.chunk_count[1] - 1, (viewport.bottom - 1) // chunk_height),
+        )
+
+    def bake_chunk(self, chunk: Tuple[int, int]) -> pygame.Surface:
+        """Generate a chunk and compose its tiles into one surface."""
+        tile_map = self.generator.generate_chunk(chunk[0], chunk[1], self.chunk_size)
+        first_col = chunk[0] * self.chunk_size
+        first_row = chunk[1] * self.chunk_size
+        surface = pygame.Surface(self.chunk_pixels)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+
+        tile_width, tile_height = TILE["size"]
+        chunk_offset = (first_col * tile_width, first_row * tile_height)
+        for y, tiles in enumerate(tile_map):
+            for x, tile_type in enumerate(tiles):
+                tile_type = self.edits.get((first_row + y, first_col + x), tile_type)
+                tiles[x] = tile_type
+                surface.blit(self.get_tile_image(tile_type), (x * tile_width, y * tile_height))
+                if self.obstacles is not None:
+                    self.obstacles.draw_cell(surface, first_row + y, first_col + x, chunk_offset)
+
+        self.chunks[chunk] = surface
+        self.chunk_maps[chunk] = tile_map
+        self.baked_count += 1
+        return surface
+
+    def get_tile(self, row: int, col: int) -> str:
+        """Tile type of a map cell."""
+        edited = self.edits.get((row, col))
+        if edited is not None:
+            return edited
+        chunk_map = self.chunk_maps.get((col // self.chunk_size, row // self.chunk_size))
+        if chunk_map is not None:
+            return chunk_map[row % self.chunk_size][col % self.chunk_size]
+        return self.generator.generate_region(col, row, 1, 1)[0][0]
+
+    def get_tile_map(self, columns: int, rows: int) -> TileMap:
+        """Tile types of the top left columns x rows cells, edits included."""
+        tile_map = self.generator.generate_region(0, 0, columns, rows)
+        for (row, col), tile_type in self.edits.items():
+            if row < rows and col < columns:
+                tile_map[row][col] = tile_type
+        return tile_map
+
+    def set_tile(self, row: int, col: int, tile_type: str) -> None:
+        """Change a map cell, repainting it if its chunk is baked."""
+        self.edits[(row, col)] = tile_type
+        chunk = (col // self.chunk_size, row // self.chunk_size)
+        if chunk in self.chunks:
+            self.chunk_maps[chunk][row % self.chunk_size][col % self.chunk_size] = tile_type
+            self.refresh_tile(row, col)
+
+    def refresh_tile(self, row: int, col: int) -> None:
+        """Repaint a tile and its obstacle, if its chunk is baked."""
+        chunk = (col // self.chunk_size, row // self.chunk_size)
+        surface = self.chunks.get(chunk)
+        if surface is None:
+            return
+        tile_width, tile_height = TILE["size"]
+        tile_type = self.chunk_maps[chunk][row % self.chunk_size][col % self.chunk_size]
+        chunk_offset = (chunk[0] * self.chunk_pixels[0], chunk[1] * self.chunk_pixels[1])
+        surface.blit(self.get_tile_image(tile_type),
+                     (col * tile_width - chunk_offset[0], row * tile_height - chunk_offset[1]))
+        if self.obstacles is not None:
+            self.obstacles.draw_cell(surface, row, col, chunk_offset)
+        self.edited_rects.append(pygame.Rect(
+            col * tile_width, row * tile_height, tile_width, tile_height))
+
+    def evict(self, chunk_range: Tuple[int, int, int, int]) -> None:
+        """Drop baked chunks too far from the visible chunk range."""
+        left, top, right, bottom = chunk_range
+        keep = self.keep_distance
+        for chunk in list(self.chunks):
+            if (chunk[0] < left - keep or chunk[0] > right + keep
+                    or chunk[1] < top - keep or chunk[1] > bottom + keep):
+                del self.chunks[chunk]
+                del self.chunk_maps[chunk]
+                self.evicted_count += 1
+
+    def draw(self, screen: pygame.Surface, viewport: pygame.Rect) -> None:
+        """Blit the visible chunks, baking missing ones and dropping far ones."""
+        chunk_range = self.get_chunk_range(viewport)
+        left, top, right, bottom = chunk_range
+        chunk_width, chunk_height = self.chunk_pixels
+        for chunk_y in range(top, bottom + 1):
+            for chunk_x in range(left, right + 1):
+                surface = self.chunks.get((chunk_x, chunk_y))
+                if surface is None:
+                    surface = self.bake_chunk((chunk_x, chunk_y))
+                screen.blit(surface, (chunk_x * chunk_width - viewport.left,
+                                      chunk_y * chunk_height - viewport.top))
+        if self.decals is not None:
+            self.decals.draw(screen, viewport)
+        self.evict(chunk_range)
+        self.edited_rects.clear()
+
+    def restore(
+        self,
+        screen: pygame.Surface,
+        viewport: pygame.Rect,
+        rects: List[pygame.Rect],
+    ) -> List[pygame.Rect]:
+        """Repaint screen rects from the baked chunks, return the edited tiles' screen rects too."""
+        edited = [rect.move(-viewport.left, -viewport.top) for rect in self.edited_rects]
+        self.edited_rects.clear()
+        chunk_width, chunk_height = self.chunk_pixels
+        for rect in rects + edited:
+            left, top, right, bottom = self.get_chunk_range(rect.move(viewport.topleft))
+            for chunk_y in range(top, bottom + 1):
+                for chunk_x in range(left, right + 1):
+                    surface = self.chunks.get((chunk_x, chunk_y))
+                    if surface is None:
+                        surface = self.bake_chunk((chunk_x, chunk_y))
+                    chunk_left = chunk_x * chunk_width - viewport.left
+                    chunk_top = chunk_y * chunk_height - viewport.top
+                    # the part of the chunk under the rect
+                    area = rect.clip(pygame.Rect(chunk_left, chunk_top, chunk_width, chunk_height))
+                    screen.blit(surface, area, area=area.move(-chunk_left, -chunk_top))
+            if self.decals is not None:
+                self.decals.draw_area(screen, viewport, rect)
+        return edited
+
+    def stats(self) -> Dict[str, int]:
+        """Chunk counters for monitoring."""
+        return {
+            "chunks": len(self.chunks),
+            "baked": self.baked_count,
+            "evicted": self.evicted_count,
+        }
@@ -0,0 +1,148 @@
+"""
+Obstacles
+Crates, barrels, sandbags, fences and trees placed on map tiles.
+"""
+
+import random
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+from .assets import ASSETS
+from .game_configs import OBSTACLE, TILE
+
+TileMap = List[List[str]]
+
+
+class Obstacle:
+    """One obstacle, centered on its tile."""
+
+    __slots__ = ("kind", "row", "col", "health", "img", "rect")
+
+    def __init__(self, kind: str, row: int, col: int) -> None:
+        self.kind = kind
+        self.row = row
+        self.col = col
+        self.health: int = OBSTACLE["health"][kind]
+
+        path = f"{OBSTACLE['assets']}/{kind}.png"
+        width, height = ASSETS.get_image(path).get_size()
+        size = (int(width * OBSTACLE["scale"]), int(height * OBSTACLE["scale"]))
+        self.img = ASSETS.get_image(path, size)
+        tile_width, tile_height = TILE["size"]
+        self.rect = self.img.get_rect(center=(
+            col * tile_width + tile_width // 2, row * tile_height + tile_height // 2))
+
+
+class ObstacleLayer:
+    """Obstacles with an occupancy grid of one slot per tile.
+
+    A cell holds 1 + the index of its obstacle in `obstacles`, or 0 when
+    empty, so finding what stands on a tile is a single array lookup.
+    Obstacles fit inside their tile, so a tank only ever checks the few
+    cells its rect covers.
+    """
+
+    def __init__(self, columns: int, rows: int) -> None:
+        self.columns = columns
+        self.rows = rows
+        self.cells = array("I", bytes(4 * columns * rows))
+        self.obstacles: List[Obstacle] = []
+        self.live_count = 0
+        # destroyed since the last pop_destroyed(), for the map and pathfinding to catch up
+        self.destroyed: List[Obstacle] = []
+
+    def __len__(self) -> int:
+        return self.live_count
+
+    def add(self, kind: str, row: int, col: int) -> Obstacle:
+        """Put an obstacle on a tile."""
+        obstacle = Obstacle(kind, row, col)
+        self.obstacles.append(obstacle)
+        self.cells[row * self.columns + col] = len(self.obstacles)
+        self.live_count += 1
+        return obstacle
+
+    def get_at(self, row: int, col: int) -> Optional[Obstacle]:
+        """Obstacle standing on a tile."""
+        if not (0 <= row < self.rows and 0 <= col < self.columns):
+            return None
+        slot = self.cells[row * self.columns + col]
+        return self.obstacles[slot - 1] if slot else None
+
+    def find_colliding(self, rect: pygame.Rect) -> Optional[Obstacle]:
+        """Obstacle whose rect collides with the given rect."""
+        tile_width, tile_height = TILE["size"]
+        for row in range(max(0, rect.top // tile_height),
+                         min(self.rows, (rect.bottom - 1) // tile_height + 1)):
+            for col in range(max(0, rect.left // tile_width),
+                             min(self.columns, (rect.right - 1) // tile_width + 1)):
+                slot = self.cells[row * self.columns + col]
+                if slot and rect.colliderect(self.obstacles[slot - 1].rect):
+                    return self.obstacles[slot - 1]
+        return None
+
+    def is_blocked(self, rect: pygame.Rect) -> bool:
+        """Whether an obstacle stands in the way of the rect."""
+        return self.find_colliding(rect) is not None
+
+    def hit(self, obstacle: Obstacle) -> bool:
+        """Damage an obstacle, return whether it got destroyed."""
+        obstacle.health -= 1
+        if obstacle.health > 0:
+            return False
+        self.cells[obstacle.row * self.columns + obstacle.col] = 0
+        self.live_count -= 1
+        self.destroyed.append(obstacle)
+        return True
+
+    def pop_destroyed(self) -> List[Obstacle]:
+        """Obstacles destroyed since the last call."""
+        destroyed = self.destroyed
+        self.destroyed = []
+        return destroyed
+
+    def draw_cell(
+        self,
+        surface: pygame.Surface,
+        row: int,
+        col: int,
+        offset: Tuple[int, int] = (0, 0),
+    ) -> None:
+        """Paint the obstacle on a tile, if any, shifted by the offset."""
+        obstacle = self.get_at(row, col)
+        if obstacle is not None:
+            surface.blit(obstacle.img, (obstacle.rect.x - offset[0], obstacle.rect.y - offset[1]))
+
+    def stats(self) -> Dict[str, int]:
+        """Obstacle counters for monitoring."""
+        return {
+            "obstacles": self.live_count,
+            "obstacles_destroyed": len(self.obstacles) - self.live_count,
+        }
+
+
+def place_obstacles(
+    tile_map: TileMap,
+    density: float,
+    keep_out_center: Optional[Tuple[float, float]] = None,
+    keep_out_radius: float = 0.0,
+) -> ObstacleLayer:
+    """Scatter obstacles over the tiles off the roads, away from the keep-out circle."""
+    rows = len(tile_map)
+    columns = len(tile_map[0]) if rows else 0
+    layer = ObstacleLayer(columns, rows)
+    kinds = sorted(OBSTACLE["health"])
+    tile_width, tile_height = TILE["size"]
+    for row, tiles in enumerate(tile_map):
+        for col, tile_type in enumerate(tiles):
+            if "road" in tile_type or random.random() >= density:
+                continue
+            if keep_out_center is not None:
+                distance_x = col * tile_width + tile_width / 2 - keep_out_center[0]
+                distance_y = row * tile_height + tile_height / 2 - keep_out_center[1]
+                if distance_x * distance_x + distance_y * distance_y < keep_out_radius * keep_out_radius:
+                    continue
+            layer.add(random.choice(kinds), row, col)
+    return layer
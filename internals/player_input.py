@@ -0,0 +1,84 @@
+"""
+Player input sources.
+Keyboard for real games, scripted sources for headless runs.
+"""
+
+from typing import TYPE_CHECKING, Iterable, List, Union
+
+import pygame
+
+if TYPE_CHECKING:
+    from .game_session import GameSession
+
+# distance in pixels between tank centres that still counts as lined up
+AIM_TOLERANCE = 8
+
+
+class PressedKeys:
+    """Key state that can be indexed like pygame.key.get_pressed()."""
+
+    def __init__(self, keys: Iterable[int] = ()) -> None:
+        self.keys = frozenset(keys)
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.keys
+
+
+KeyState = Union[pygame.key.ScancodeWrapper, PressedKeys]
+
+
+class KeyboardInput:
+    """Keys held on the real keyboard."""
+
+    def get_pressed(self, session: "GameSession") -> KeyState:
+        """Key state for the current tick."""
+        return pygame.key.get_pressed()
+
+
+class AutoPilotInput:
+    """Hunts the nearest bot: line up on one axis, turn to face it, then shoot."""
+
+    def get_pressed(self, session: "GameSession") -> KeyState:
+        """Key state for the current tick."""
+        player = session.player_tank
+        targets = [bot for bot in session.bot_tanks if bot.is_alive]
+        if not targets or not player.is_alive:
+            return PressedKeys()
+
+        player_x, player_y = player.rect.center
+        target = min(targets, key=lambda bot: (
+            abs(bot.rect.centerx - player_x) + abs(bot.rect.centery - player_y)))
+        distance_x = target.rect.centerx - player_x
+        distance_y = target.rect.centery - player_y
+
+        keys: List[int] = []
+        if abs(distance_x) <= AIM_TOLERANCE:
+            facing = "DOWN" if distance_y > 0 else "UP"
+        elif abs(distance_y) <= AIM_TOLERANCE:
+            facing = "RIGHT" if distance_x > 0 else "LEFT"
+        else:
+            # close the shorter gap first to line up quickly
+            if abs(distance_x) < abs(distance_y):
+                step = (AIM_TOLERANCE if distance_x > 0 else -AIM_TOLERANCE, 0)
+                keys.append(pygame.K_RIGHT if distance_x > 0 else pygame.K_LEFT)
+            else:
+                step = (0, AIM_TOLERANCE if distance_y > 0 else -AIM_TOLERANCE)
+                keys.append(pygame.K_DOWN if distance_y > 0 else pygame.K_UP)
+            # shoot a way through obstacles on the way
+            if player.is_blocked(player.rect.move(step)):
+                keys.append(pygame.K_SPACE)
+            return PressedKeys(keys)
+
+        if player.direction == facing:
+            keys.append(pygame.K_SPACE)
+        else:
+            keys.append({
+                "UP": pygame.K_UP,
+                "DOWN": pygame.K_DOWN,
+                "LEFT": pygame.K_LEFT,
+                "RIGHT": pygame.K_RIGHT,
+            }[facing])
+        return PressedKeys(keys)
+
+
+InputSource = Union[KeyboardInput, AutoPilotInput]
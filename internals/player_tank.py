@@ -2,16 +2,23 @@
 Player Tank
 """
 
-from typing import TYPE_CHECKING, List, Union
+from typing import TYPE_CHECKING, List, Optional, Union
 
 import pygame
 
-from .effects import SHOOTING_SFX
-from .bullet import Bullet
+from .assets import ASSETS
+from .game_clock import GAME_CLOCK
+from .sound import SOUNDS
+from .render_queue import BULLETS, TANKS, RenderQueue
+from .bullet import Bullet, BulletPool
 from .game_configs import GAME, PLAYER_TANK, TANK_DIRECTION, BULLET
 
 if TYPE_CHECKING:
     from .bot_tank import MovableBotTank
+    from .explosions import EffectPool
+    from .obstacles import ObstacleLayer
+    from .player_input import KeyState
+    from .spatial_hash import SpatialHash
 
 
 class PlayerTank:
@@ -27,10 +34,13 @@ class PlayerTank:
         death_asset: str = PLAYER_TANK["asset"],
         health: int = 6,
         bullet_asset: str = BULLET["asset"],
+        spatial_index: Optional["SpatialHash"] = None,
+        obstacles: Optional["ObstacleLayer"] = None,
+        effects: Optional["EffectPool"] = None,
     ) -> None:
         self.x = x
         self.y = y
-        self.speed = 2
+        self.speed = GAME["player_speed"]
         self.direction = "UP"
         self.initial_direction = None
         self.health = health
@@ -38,13 +48,24 @@ class PlayerTank:
 
         self.asset = asset
         self.death_asset = death_asset
-        self.img = pygame.image.load(self.asset)
-        self.img = pygame.transform.scale(self.img, PLAYER_TANK["size"])
+        self.img = ASSETS.get_image(self.asset, PLAYER_TANK["size"])
+        self.sprites = ASSETS.get_rotations(
+            self.asset, PLAYER_TANK["size"], TANK_DIRECTION)
         self.rect = self.img.get_rect(topleft=(self.x, self.y))
 
+        self.spatial_index = spatial_index
+        if self.spatial_index is not None:
+            self.spatial_index.insert(self, self.rect)
+        self.obstacles = obstacles
+        self.effects = effects
+        # moves stopped by a tank or an obstacle, and bullets that hit something
+        self.tank_collisions = 0
+        self.obstacle_collisions = 0
+        self.bullet_hits = 0
+
         self.bullet_asset = bullet_asset
         self.bullet = bullet
-        self.bullets: List["Bullet"] = []
+        self.bullets = BulletPool(bullet, asset=self.bullet_asset)
         self.last_shot_time = 0
         self.bullet_speed = 6
         self.cooldown = reload_time
@@ -55,14 +76,23 @@ class PlayerTank:
         tanks_list: List[Union["PlayerTank", "MovableBotTank"]]
     ) -> bool:
         """Check if tank's position will collide with other tanks."""
+        if self.spatial_index is not None:
+            # only tanks in the grid cells around new_rect can collide
+            if not self.is_alive:
+                return False
+            return self.spatial_index.find_colliding(new_rect, ignore=self) is not None
         for tank in tanks_list:
             if tank != self and self.is_alive and new_rect.colliderect(tank.rect):
                 return True
         return False
 
+    def is_blocked(self, new_rect: pygame.Rect) -> bool:
+        """Check if an obstacle stands in the tank's new position."""
+        return self.obstacles is not None and self.obstacles.is_blocked(new_rect)
+
     def move_on_keypress(
         self,
-        keys: pygame.key.ScancodeWrapper,
+        keys: "KeyState",
         tanks_list: List[Union["PlayerTank", "MovableBotTank"]]
     ) -> None:
         """Movement handler for keys input, check tanks collisions."""
@@ -93,26 +123,32 @@ class PlayerTank:
         new_rect.x = int(new_x_pos)
         new_rect.y = int(new_y_pos)
 
-        if not self.is_colliding_tank(new_rect, tanks_list):
-            # restrict movement to screen boundaries
-            screen_width, screen_height = GAME["screen_size"]
+        if self.is_colliding_tank(new_rect, tanks_list):
+            self.tank_collisions += 1
+        elif self.is_blocked(new_rect):
+            self.obstacle_collisions += 1
+        else:
+            # restrict movement to world boundaries
+            world_width, world_height = GAME["world_size"]
 
             # check horizontal boundaries
-            if 0 <= new_x_pos <= screen_width - self.rect.width:
+            if 0 <= new_x_pos <= world_width - self.rect.width:
                 self.x = new_x_pos
 
             # check vertical boundaries
-            if 0 <= new_y_pos <= screen_height - self.rect.height:
+            if 0 <= new_y_pos <= world_height - self.rect.height:
                 self.y = new_y_pos
 
             # Update the tank's rectangle to match its new position
             self.rect.topleft = (int(self.x), int(self.y))
+            if self.spatial_index is not None:
+                self.spatial_index.update(self, self.rect)
 
     def can_shoot(self) -> bool:
         """Restrict bullets from shooting continuously by setting bullet reload cooldown."""
         if not self.is_alive:
             return False
-        current_time = pygame.time.get_ticks()
+        current_time = GAME_CLOCK.get_ticks()
         if current_time - self.last_shot_time >= self.cooldown:
             return True
         return False
@@ -120,7 +156,7 @@ class PlayerTank:
     def shoot(self) -> None:
         """Shoot the bullet"""
         if self.can_shoot():
-            SHOOTING_SFX.play()
+            SOUNDS.play("shot", self.rect.center)
 
             bullet_center_x = self.x
             bullet_center_y = self.y
@@ -140,57 +176,73 @@ class PlayerTank:
                 bullet_center_x = self.x + (3 * x_shift)
                 bullet_center_y = self.y + (1.4 * y_shift)
 
-            bullet = self.bullet(
+            self.bullets.spawn(
                 bullet_center_x,
                 bullet_center_y,
                 self.direction,
                 asset=self.bullet_asset
             )
-            self.bullets.append(bullet)
-            self.last_shot_time = pygame.time.get_ticks()
+            self.last_shot_time = GAME_CLOCK.get_ticks()
 
     def update_bullets(self) -> None:
-        """Remove bullets that're out of screen"""
-        self.bullets = [bullet for bullet in self.bullets if bullet.y > 0]
+        """Move bullets and recycle the ones that're out of screen"""
+        if not self.is_alive:
+            return
+        self.bullets.update()
 
     def process_bullet_collision(
         self,
         tanks_list: List[Union["PlayerTank", "MovableBotTank"]]
     ) -> None:
-        """Check if the bullets hit any other tanks and calculate the health on hit."""
-        for bullet in self.bullets[:]:
-            bullet_rect = pygame.Rect(
-                bullet.x, bullet.y, bullet.img.get_width(), bullet.img.get_height())
-
-            for tank in tanks_list:
-                if tank == self:
+        """Check if the bullets hit any other tanks or obstacles and calculate the health on hit."""
+        for bullet in self.bullets.live[:]:
+            if self.obstacles is not None:
+                obstacle = self.obstacles.find_colliding(bullet.rect)
+                if obstacle is not None:
+                    self.bullets.release(bullet)
+                    is_destroyed = self.obstacles.hit(obstacle)
+                    self.bullet_hits += 1
+                    SOUNDS.play("explosion" if is_destroyed else "hit", obstacle.rect.center)
+                    if self.effects is not None:
+                        self.effects.puff(*bullet.rect.center)
+                        if is_destroyed:
+                            self.effects.explode(*obstacle.rect.center)
                     continue
 
-                tank_rect = pygame.Rect(
-                    tank.x, tank.y, tank.rect.width, tank.rect.height)
-
-                if bullet_rect.colliderect(tank_rect):
-                    self.bullets.remove(bullet)
-                    tank.health -= 1
-                    if tank.health <= 0:
-                        tanks_list.remove(tank)
-                        tank.is_alive = False
-                    break
-
-    def draw(self, screen: pygame.Surface) -> None:
-        """Paint the Tank and Bullets"""
-        # draw the tank according to direction
-        rotated_img = pygame.transform.rotate(
-            self.img,
-            TANK_DIRECTION[self.direction]
-        )
-        center = (self.x + self.rect.width / 2, self.y + self.rect.height / 2)
-        rotated_rect = rotated_img.get_rect(center=center)
-        screen.blit(rotated_img, rotated_rect.topleft)
+            if self.spatial_index is not None:
+                # narrow the search to tanks sharing a grid cell with the bullet
+                hit_tank = self.spatial_index.find_colliding(
+                    bullet.rect, ignore=self)
+            else:
+                hit_tank = next((
+                    tank for tank in tanks_list
+                    if tank != self and bullet.rect.colliderect(tank.rect)
+                ), None)
+
+            if hit_tank is not None:
+                self.bullets.release(bullet)
+                self.bullet_hits += 1
+                hit_tank.health -= 1
+                SOUNDS.play("explosion" if hit_tank.health <= 0 else "hit", hit_tank.rect.center)
+                if self.effects is not None:
+                    self.effects.puff(*bullet.rect.center)
+                if hit_tank.health <= 0:
+                    tanks_list.remove(hit_tank)
+                    hit_tank.is_alive = False
+                    if self.spatial_index is not None:
+                        self.spatial_index.remove(hit_tank)
+                    if self.effects is not None:
+                        self.effects.explode(*hit_tank.rect.center)
+
+    def queue_sprites(self, render_queue: RenderQueue, viewport: Optional[pygame.Rect] = None) -> None:
+        """Queue the Tank and the Bullets inside the viewport"""
+        offset = viewport.topleft if viewport is not None else (0, 0)
+        # the pre-rotated tank image according to direction
+        img, (offset_x, offset_y) = self.sprites[self.direction]
+        render_queue.add(TANKS, img, (self.x - offset[0] + offset_x, self.y - offset[1] + offset_y))
 
         if self.is_alive:
-            # draw bullets
-            self.update_bullets()
+            # bullets, skipping the ones off screen
             for bullet in self.bullets:
-                bullet.move()
-                bullet.draw(screen)
+                if viewport is None or viewport.colliderect(bullet.rect):
+                    render_queue.add(BULLETS, bullet.img, (bullet.x - offset[0], bullet.y - offset[1]))
@@ -0,0 +1,198 @@
+"""
+Frame profiler.
+Per-phase frame timings, an on-screen overlay and per-frame sample files.
+"""
+
+import csv
+import json
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, TextIO
+
+import pygame
+
+from .assets import ASSETS
+from .game_configs import GAME, PROFILER
+
+# frame phases in the order game_life_cycle runs them
+PHASES = [
+    "input",
+    "player",
+    "bots_update",
+    "map",
+    "bots_draw",
+    "end_screen",
+    "overlay",
+    "flip",
+    "idle",
+]
+# upper bounds (ms) of the histogram buckets, the last bucket is open ended
+HISTOGRAM_BUCKETS = [0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.7, 33.3]
+# frames between overlay text refreshes
+OVERLAY_REFRESH = 10
+
+
+def percentile(samples: List[float], percent: float) -> float:
+    """Nearest-rank percentile of the samples."""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class FrameProfiler:
+    """Times each frame phase and keeps rolling windows of the samples.
+
+    Every method returns straight away while the profiler is disabled.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        show_overlay: bool = False,
+        output: Optional[str] = None,
+        window: int = 120,
+    ) -> None:
+        self.enabled = enabled or show_overlay
+        self.show_overlay = show_overlay
+        self.window = window
+        self.history: Dict[str, Deque[float]] = {
+            phase: deque(maxlen=window) for phase in PHASES + ["frame"]}
+        self.current: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        # ms from launch to each startup step, see LoadingScreen
+        self.startup: Dict[str, float] = {}
+        self.frame = 0
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+        # False from turning on mid-frame until the next begin_frame()
+        self.is_frame_timed = False
+
+        self.output = output
+        self.output_file: Optional[TextIO] = None
+        self.csv_writer: Optional["csv.DictWriter[str]"] = None
+        self.overlay_panel: Optional[pygame.Surface] = None
+        if output is not None:
+            self.open_output(output)
+
+    @classmethod
+    def from_config(cls) -> "FrameProfiler":
+        """Profiler set up from the PROFILER config."""
+        return cls(
+            enabled=PROFILER["enabled"],
+            show_overlay=PROFILER["show_overlay"],
+            output=PROFILER["output"],
+            window=PROFILER["window"],
+        )
+
+    def open_output(self, path: str) -> None:
+        """Stream one sample per frame to a .jsonl or .csv file."""
+        self.enabled = True
+        self.output_file = open(path, "w", encoding="utf-8", newline="")
+
+    def close(self) -> None:
+        """Flush and close the sample file."""
+        if self.output_file is not None:
+            self.output_file.close()
+            self.output_file = None
+            self.csv_writer = None
+
+    def toggle_overlay(self) -> None:
+        """Show or hide the overlay, measuring only while something needs it."""
+        self.show_overlay = not self.show_overlay
+        self.enabled = self.show_overlay or self.output_file is not None
+        if not self.enabled:
+            self.is_frame_timed = False
+
+    def report_startup(self, timings: Dict[str, float]) -> None:
+        """Keep the startup timings for the overlay, and print them when profiling."""
+        self.startup = dict(timings)
+        if self.enabled:
+            print("Startup: " + ", ".join(f"{step} {ms:.0f} ms" for step, ms in timings.items()))
+
+    def begin_frame(self) -> None:
+        """Start timing a frame."""
+        if not self.enabled:
+            return
+        self.frame_start = self.last_mark = time.perf_counter()
+        self.current = {}
+        self.is_frame_timed = True
+
+    def mark(self, phase: str) -> None:
+        """Charge the time since the previous mark to a phase."""
+        if not self.is_frame_timed:
+            return
+        now = time.perf_counter()
+        self.current[phase] = self.current.get(phase, 0.0) + (now - self.last_mark) * 1_000
+        self.last_mark = now
+
+    def end_frame(self, counts: Optional[Dict[str, int]] = None) -> None:
+        """Store the frame's samples and stream them out."""
+        # a frame the profiler was turned on in the middle of is skipped
+        if not self.is_frame_timed:
+            return
+        self.frame += 1
+        frame_ms = (time.perf_counter() - self.frame_start) * 1_000
+        for phase in PHASES:
+            self.history[phase].append(self.current.get(phase, 0.0))
+        self.history["frame"].append(frame_ms)
+        if counts is not None:
+            self.counts = counts
+
+        if self.output_file is not None:
+            sample: Dict[str, float] = {"frame": self.frame, "frame_ms": frame_ms}
+            sample.update(self.current)
+            sample.update(self.counts)
+            if self.output is not None and self.output.endswith(".csv"):
+                if self.csv_writer is None:
+                    # columns follow the first sample: phases, then counts
+                    fieldnames = ["frame", "frame_ms"] + PHASES + list(self.counts)
+                    self.csv_writer = csv.DictWriter(
+                        self.output_file, fieldnames=fieldnames, restval=0.0, extrasaction="ignore")
+                    self.csv_writer.writeheader()
+                self.csv_writer.writerow(sample)
+            else:
+                self.output_file.write(json.dumps(sample) + "\n")
+
+    def mean(self, phase: str) -> float:
+        """Mean milliseconds of a phase over the rolling window."""
+        samples = self.history[phase]
+        return sum(samples) / len(samples) if samples else 0.0
+
+    def histogram(self, phase: str) -> List[int]:
+        """Sample counts per HISTOGRAM_BUCKETS bucket over the rolling window."""
+        buckets = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        for sample in self.history[phase]:
+            index = 0
+            while index < len(HISTOGRAM_BUCKETS) and sample > HISTOGRAM_BUCKETS[index]:
+                index += 1
+            buckets[index] += 1
+        return buckets
+
+    def fps(self) -> float:
+        """Frames per second over the rolling window."""
+        frame_ms = self.mean("frame")
+        return 1_000 / frame_ms if frame_ms else 0.0
+
+    def draw_overlay(self, screen: pygame.Surface) -> Optional[pygame.Rect]:
+        """Paint FPS, per-phase ms and entity counts in the top left corner."""
+        if not self.show_overlay:
+            return None
+        # re-render the text every few frames only, it is unreadable at 60 Hz anyway
+        if self.overlay_panel is None or self.frame % OVERLAY_REFRESH == 0:
+            self.overlay_panel = self.render_overlay()
+        return screen.blit(self.overlay_panel, (8, 8))
+
+    def render_overlay(self) -> pygame.Surface:
+        """Render the overlay text panel."""
+        font = ASSETS.get_font(GAME["font"], 20)
+        lines = [f"FPS {self.fps():.0f}  frame {self.mean('frame'):.2f} ms"]
+        lines.extend(f"{phase:<12} {self.mean(phase):6.2f} ms" for phase in PHASES)
+        lines.extend(f"{name:<12} {count}" for name, count in self.counts.items())
+        lines.extend(f"{step:<12} {ms:6.0f} ms" for step, ms in self.startup.items())
+
+        line_height = font.get_linesize()
+        panel = pygame.Surface((220, line_height * len(lines) + 8), pygame.SRCALPHA)
+        panel.fill((15, 23, 42, 180))
+        for i, line in enumerate(lines):
+            panel.blit(font.render(line, True, (255, 255, 255)), (6, 4 + i * line_height))
+        return panel
@@ -0,0 +1,59 @@
+"""
+Render queue.
+Sprites collected into layers over a frame, then painted with one
+Surface.blits() call per layer.
+"""
+
+from typing import Dict, List, Tuple
+
+import pygame
+
+# layers in painting order, later layers cover earlier ones
+GROUND = 0
+TANKS = 1
+BULLETS = 2
+EFFECTS = 3
+HUD = 4
+LAYER_NAMES = ["ground", "tanks", "bullets", "effects", "hud"]
+
+# an image and the screen position of its top left corner
+Sprite = Tuple[pygame.Surface, Tuple[float, float]]
+
+
+class RenderQueue:
+    """Per-layer lists of sprites waiting to be painted.
+
+    Queuing a sprite is one list append, and each layer reaches pygame as
+    a single blits() call, so the Python work per sprite stays small when
+    thousands of them are on screen.
+    """
+
+    def __init__(self) -> None:
+        self.layers: List[List[Sprite]] = [[] for _ in LAYER_NAMES]
+        self.sprites_drawn = 0
+        self.blits_calls = 0
+
+    def add(self, layer: int, img: pygame.Surface, position: Tuple[float, float]) -> None:
+        """Queue an image at a screen position on a layer."""
+        self.layers[layer].append((img, position))
+
+    def flush(self, screen: pygame.Surface) -> List[pygame.Rect]:
+        """Paint and empty every layer, return the painted areas."""
+        painted: List[pygame.Rect] = []
+        self.sprites_drawn = 0
+        self.blits_calls = 0
+        for sprites in self.layers:
+            if not sprites:
+                continue
+            painted.extend(screen.blits(sprites))
+            self.sprites_drawn += len(sprites)
+            self.blits_calls += 1
+            sprites.clear()
+        return painted
+
+    def stats(self) -> Dict[str, int]:
+        """Counters of the last flush for monitoring."""
+        return {
+            "sprites_drawn": self.sprites_drawn,
+            "blits_calls": self.blits_calls,
+        }
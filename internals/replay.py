@@ -0,0 +1,226 @@
+"""
+Replays.
+Per-tick input recording in a compact binary file, and max-speed headless
+playback that checks the run ends in the same state.
+"""
+
+import json
+import time
+import struct
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import pygame
+
+from .game_clock import GAME_CLOCK
+from .game_configs import GAME
+from .game_session import GameSession
+from .headless import start_simulation
+from .player_input import KeyState, PressedKeys
+from .profiler import percentile
+
+ReplayReport = Dict[str, Union[int, float, bool, str, None]]
+
+# File layout, little endian:
+#   header  magic, version, seed (u64), ticks (u32), state hash (8 bytes),
+#           config length (u16)
+#   config  JSON of the REPLAY_CONFIG_KEYS of GAME
+#   inputs  runs of (key mask u8, run length varint), one run per change
+MAGIC = b"TNKR"
+VERSION = 1
+HEADER = struct.Struct("<4sBQI8sH")
+
+# GAME settings that change how a match plays out
+REPLAY_CONFIG_KEYS = [
+    "bots_count",
+    "bot_intervals",
+    "player_speed",
+    "bot_speed",
+    "world_size",
+    "random_map",
+    "map_seed",
+    "batched_bots",
+    "bot_ai",
+    "obstacle_density",
+    "spawn_keep_out",
+]
+
+# one bit per game action, each action reads both of its keys
+KEY_BITS: List[Tuple[int, Tuple[int, ...]]] = [
+    (1, (pygame.K_LEFT, pygame.K_a)),
+    (2, (pygame.K_RIGHT, pygame.K_d)),
+    (4, (pygame.K_UP, pygame.K_w)),
+    (8, (pygame.K_DOWN, pygame.K_s)),
+    (16, (pygame.K_SPACE,)),
+]
+
+
+def encode_keys(keys: KeyState) -> int:
+    """Key mask of the game actions held down."""
+    mask = 0
+    for bit, key_codes in KEY_BITS:
+        if any(keys[key] for key in key_codes):
+            mask |= bit
+    return mask
+
+
+def decode_keys(mask: int) -> PressedKeys:
+    """Key state holding the first key of every action in the mask."""
+    return PressedKeys(key_codes[0] for bit, key_codes in KEY_BITS if mask & bit)
+
+
+def write_varint(buffer: bytearray, value: int) -> None:
+    """Append an unsigned integer, 7 bits per byte."""
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """Unsigned integer at the offset, and the offset after it."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class Replay:
+    """A recorded match: its seed, settings, inputs and final state."""
+
+    def __init__(
+        self,
+        seed: int,
+        config: Optional[Dict[str, object]] = None,
+        runs: Optional[List[Tuple[int, int]]] = None,
+        state_hash: str = "",
+    ) -> None:
+        self.seed = seed
+        if config is None:
+            config = {key: GAME[key] for key in REPLAY_CONFIG_KEYS}
+        self.config = config
+        # (key mask, ticks held) pairs
+        self.runs: List[Tuple[int, int]] = runs if runs is not None else []
+        self.state_hash = state_hash
+
+    @property
+    def ticks(self) -> int:
+        """Recorded ticks."""
+        return sum(length for _, length in self.runs)
+
+    def record(self, keys: KeyState) -> None:
+        """Append one tick of input."""
+        mask = encode_keys(keys)
+        if self.runs and self.runs[-1][0] == mask:
+            self.runs[-1] = (mask, self.runs[-1][1] + 1)
+        else:
+            self.runs.append((mask, 1))
+
+    def masks(self) -> Iterator[int]:
+        """Key mask of every tick, in order."""
+        for mask, length in self.runs:
+            for _ in range(length):
+                yield mask
+
+    def apply_config(self) -> None:
+        """Restore the recorded GAME settings."""
+        for key, value in self.config.items():
+            if key == "world_size":
+                value = tuple(value)  # JSON turns tuples into lists
+            GAME[key] = value
+
+    def save(self, path: str) -> None:
+        """Write the replay file."""
+        config = json.dumps(self.config, separators=(",", ":")).encode()
+        data = bytearray(HEADER.pack(
+            MAGIC, VERSION, self.seed, self.ticks, bytes.fromhex(self.state_hash), len(config)))
+        data += config
+        for mask, length in self.runs:
+            data.append(mask)
+            write_varint(data, length)
+        with open(path, "wb") as file:
+            file.write(data)
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        """Read a replay file."""
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, seed, ticks, state_hash, config_length = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} replay file")
+        offset = HEADER.size
+        config = json.loads(data[offset:offset + config_length])
+        offset += config_length
+
+        runs: List[Tuple[int, int]] = []
+        while offset < len(data):
+            mask = data[offset]
+            length, offset = read_varint(data, offset + 1)
+            runs.append((mask, length))
+        replay = cls(seed, config, runs, state_hash.hex())
+        if replay.ticks != ticks:
+            raise ValueError(f"{path} is truncated: {replay.ticks} of {ticks} ticks")
+        return replay
+
+
+def run_replay(path: str, render: bool = False) -> ReplayReport:
+    """Play a replay headless as fast as possible and check its final state."""
+    replay = Replay.load(path)
+    saved_config = {key: GAME[key] for key in REPLAY_CONFIG_KEYS}
+    replay.apply_config()
+
+    screen = start_simulation()
+    try:
+        session = GameSession(seed=replay.seed)
+        frame_times: List[float] = []
+        start_time = time.perf_counter()
+        for mask in replay.masks():
+            frame_start = time.perf_counter()
+            session.update(decode_keys(mask))
+            if render:
+                session.draw(screen)
+            frame_times.append((time.perf_counter() - frame_start) * 1_000)
+        wall_time = time.perf_counter() - start_time
+        state_hash = session.state_hash()
+    finally:
+        GAME_CLOCK.use_wall_clock()
+        GAME.update(saved_config)
+
+    return {
+        "ticks": session.tick,
+        "wall_time": wall_time,
+        "ticks_per_second": session.tick / wall_time if wall_time else 0.0,
+        "won": session.is_player_won,
+        "time_to_win": session.elapsed_time if session.is_player_won else None,
+        "expected_hash": replay.state_hash,
+        "state_hash": state_hash,
+        "is_matching": state_hash == replay.state_hash,
+        "frame_mean_ms": sum(frame_times) / len(frame_times) if frame_times else 0.0,
+        "frame_p95_ms": percentile(frame_times, 95) if frame_times else 0.0,
+        "frame_p99_ms": percentile(frame_times, 99) if frame_times else 0.0,
+        "frame_max_ms": max(frame_times, default=0.0),
+    }
+
+
+def print_replay_report(report: ReplayReport) -> None:
+    """Print a replay report."""
+    print(f"Ticks: {report['ticks']}")
+    print(f"Ticks/sec: {report['ticks_per_second']:.0f}")
+    if report["won"]:
+        print(f"Time to win: {report['time_to_win']:.2f} seconds (game time)")
+    else:
+        print("Time to win: not won")
+    print(f"Frame time: mean {report['frame_mean_ms']:.3f} ms"
+          f"  p95 {report['frame_p95_ms']:.3f} ms"
+          f"  p99 {report['frame_p99_ms']:.3f} ms"
+          f"  max {report['frame_max_ms']:.3f} ms")
+    if report["is_matching"]:
+        print(f"State hash: {report['state_hash']} (matches the recording)")
+    else:
+        print(f"State hash: {report['state_hash']} "
+              f"(MISMATCH, recording ended at {report['expected_hash']})")
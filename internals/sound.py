@@ -0,0 +1,176 @@
+"""
+Sound manager.
+Sound effects share a fixed pool of mixer channels, with priorities,
+per-sample rate limits and volume falling off with distance.
+"""
+
+import math
+import random
+from array import array
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import pygame
+
+from .assets import ASSETS
+from .game_clock import GAME_CLOCK
+from .game_configs import SOUND
+
+Position = Tuple[float, float]
+
+# seeds the noise of synthesized samples, apart from the game's random state
+NOISE_SEED = 7
+
+
+def make_noise_burst(duration: int) -> Optional[pygame.mixer.Sound]:
+    """Fading, muffled noise in the mixer's format, None unless it is 16 bit."""
+    frequency, sample_format, channels = pygame.mixer.get_init()
+    if sample_format != -16:
+        return None
+    rng = random.Random(NOISE_SEED)
+    count = frequency * duration // 1_000
+    samples = array("h")
+    level = 0.0
+    for i in range(count):
+        # a one-pole low-pass turns white noise into a rumble
+        level += (rng.uniform(-1, 1) - level) * 0.2
+        value = int(level * 32_767 * (1 - i / count) ** 2)
+        samples.extend([value] * channels)
+    return pygame.mixer.Sound(buffer=samples.tobytes())
+
+
+class SoundManager:
+    """Plays named samples from SOUND["samples"] on reserved channels.
+
+    A new sound takes an idle channel, or else the oldest sound of no
+    higher priority. Plays over a sample's limit within its window are
+    coalesced into the ones already playing instead of stacking up.
+    """
+
+    def __init__(self, channel_count: int = SOUND["channels"]) -> None:
+        self.channel_count = channel_count
+        self.channels: List[pygame.mixer.Channel] = []
+        # priority and start time of the sound on each channel
+        self.playing: List[Tuple[int, int]] = []
+        self.recent: Dict[str, Deque[int]] = {}
+        self.listener: Optional[Position] = None
+        self.noise_bursts: Dict[str, Optional[pygame.mixer.Sound]] = {}
+        # off in simulations, play() then returns before touching the mixer
+        self.is_enabled = True
+
+        self.played = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.stolen = 0
+        self.out_of_range = 0
+
+    def open_channels(self) -> bool:
+        """Reserve the channel pool on first use, return whether sound can play."""
+        if self.channels:
+            return True
+        if not ASSETS.init_mixer():
+            return False
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), self.channel_count))
+        # reserved channels are never picked by a plain Sound.play()
+        pygame.mixer.set_reserved(self.channel_count)
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.channel_count)]
+        self.playing = [(0, 0)] * self.channel_count
+        return True
+
+    def set_listener(self, position: Optional[Position]) -> None:
+        """Hear positioned sounds from here, None plays them all at full volume."""
+        self.listener = position
+
+    def get_volumes(self, volume: float, position: Optional[Position]) -> Tuple[float, float]:
+        """Left and right volume of a sound heard from the listener."""
+        if position is None or self.listener is None:
+            return volume, volume
+        distance_x = position[0] - self.listener[0]
+        distance_y = position[1] - self.listener[1]
+        falloff = max(0.0, 1 - math.hypot(distance_x, distance_y) / SOUND["max_distance"])
+        # sounds to one side are quieter in the other ear
+        pan = max(-1.0, min(1.0, distance_x / SOUND["max_distance"]))
+        return volume * falloff * min(1.0, 1 - pan), volume * falloff * min(1.0, 1 + pan)
+
+    def is_rate_limited(self, name: str, now: int) -> bool:
+        """Whether the sample already played its limit within its window."""
+        sample = SOUND["samples"][name]
+        recent = self.recent.setdefault(name, deque())
+        while recent and now - recent[0] >= sample["window"]:
+            recent.popleft()
+        if len(recent) >= sample["limit"]:
+            return True
+        recent.append(now)
+        return False
+
+    def get_sound(self, name: str) -> Optional[pygame.mixer.Sound]:
+        """Sound of a sample, synthesizing noise bursts on first use."""
+        sample = SOUND["samples"][name]
+        if "path" in sample:
+            return ASSETS.get_sound(sample["path"])
+        if name not in self.noise_bursts:
+            self.noise_bursts[name] = make_noise_burst(sample["noise"])
+        return self.noise_bursts[name]
+
+    def prepare(self) -> None:
+        """Open the channels and synthesize the noise bursts ahead of the match."""
+        if self.is_enabled and self.open_channels():
+            for name in SOUND["samples"]:
+                self.get_sound(name)
+
+    def pick_channel(self, priority: int) -> Optional[int]:
+        """Index of an idle channel, or of the oldest sound of no higher priority."""
+        victim: Optional[int] = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return i
+            if self.playing[i][0] <= priority and (victim is None or self.playing[i] < self.playing[victim]):
+                victim = i
+        if victim is not None:
+            self.stolen += 1
+        return victim
+
+    def play(self, name: str, position: Optional[Position] = None) -> bool:
+        """Play a sample, at a world position to fade it with distance."""
+        if not self.is_enabled:
+            return False
+        sample = SOUND["samples"][name]
+        left, right = self.get_volumes(sample["volume"], position)
+        if left <= 0 and right <= 0:
+            self.out_of_range += 1
+            return False
+
+        now = GAME_CLOCK.get_ticks()
+        if self.is_rate_limited(name, now):
+            self.coalesced += 1
+            return False
+        if not self.open_channels():
+            return False
+        sound = self.get_sound(name)
+        if sound is None:
+            return False
+
+        index = self.pick_channel(sample["priority"])
+        if index is None:
+            self.dropped += 1
+            return False
+        channel = self.channels[index]
+        channel.play(sound)
+        channel.set_volume(left, right)
+        self.playing[index] = (sample["priority"], now)
+        self.played += 1
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Sound counters for monitoring."""
+        return {
+            "sounds_played": self.played,
+            "sounds_coalesced": self.coalesced,
+            "sounds_dropped": self.dropped,
+            "sounds_stolen": self.stolen,
+            "sounds_out_of_range": self.out_of_range,
+            "channels_busy": sum(1 for channel in self.channels if channel.get_busy()),
+        }
+
+
+SOUNDS = SoundManager()
@@ -0,0 +1,98 @@
+"""
+Spatial hash
+Uniform grid broadphase for tank and bullet collisions.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pygame
+
+from .game_configs import TILE
+
+CellRange = Tuple[int, int, int, int]
+
+
+class SpatialHash:
+    """Uniform grid of cells, each holding the objects whose rect overlaps it.
+
+    Stored objects must expose a `rect` attribute. Cells keep their
+    objects in insertion order (dict keys rather than sets), so lookups
+    do not depend on object ids and replays stay deterministic.
+    """
+
+    def __init__(self, cell_size: int = TILE["size"][0]) -> None:
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], Dict[Any, None]] = {}
+        self.object_cells: Dict[Any, CellRange] = {}
+
+    def __len__(self) -> int:
+        return len(self.object_cells)
+
+    def __contains__(self, obj: Any) -> bool:
+        return obj in self.object_cells
+
+    def get_cell_range(self, rect: pygame.Rect) -> CellRange:
+        """First and last cell columns and rows covered by the rect."""
+        size = self.cell_size
+        return (
+            rect.left // size,
+            rect.top // size,
+            (rect.right - 1) // size,
+            (rect.bottom - 1) // size,
+        )
+
+    def iter_cells(self, cell_range: CellRange) -> Iterator[Tuple[int, int]]:
+        """Every cell key inside a cell range."""
+        left, top, right, bottom = cell_range
+        for cell_x in range(left, right + 1):
+            for cell_y in range(top, bottom + 1):
+                yield (cell_x, cell_y)
+
+    def insert(self, obj: Any, rect: pygame.Rect) -> None:
+        """Register an object at the given rect."""
+        if obj in self.object_cells:
+            self.update(obj, rect)
+            return
+        cell_range = self.get_cell_range(rect)
+        self.object_cells[obj] = cell_range
+        for cell in self.iter_cells(cell_range):
+            self.cells.setdefault(cell, {})[obj] = None
+
+    def remove(self, obj: Any) -> None:
+        """Unregister an object."""
+        cell_range = self.object_cells.pop(obj, None)
+        if cell_range is None:
+            return
+        for cell in self.iter_cells(cell_range):
+            bucket = self.cells.get(cell)
+            if bucket is not None:
+                bucket.pop(obj, None)
+                if not bucket:
+                    del self.cells[cell]
+
+    def update(self, obj: Any, rect: pygame.Rect) -> None:
+        """Move an object, touching the grid only when it changes cells."""
+        cell_range = self.get_cell_range(rect)
+        if self.object_cells.get(obj) == cell_range:
+            return
+        self.remove(obj)
+        self.object_cells[obj] = cell_range
+        for cell in self.iter_cells(cell_range):
+            self.cells.setdefault(cell, {})[obj] = None
+
+    def query(self, rect: pygame.Rect) -> List[Any]:
+        """Objects sharing a cell with the rect (broadphase candidates)."""
+        found: Dict[Any, None] = {}
+        for cell in self.iter_cells(self.get_cell_range(rect)):
+            bucket = self.cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        return list(found)
+
+    def find_colliding(self, rect: pygame.Rect, ignore: Any = None) -> Optional[Any]:
+        """First object whose rect collides with the given rect."""
+        for cell in self.iter_cells(self.get_cell_range(rect)):
+            for obj in self.cells.get(cell, ()):
+                if obj is not ignore and rect.colliderect(obj.rect):
+                    return obj
+        return None
@@ -0,0 +1,192 @@
+"""
+Tank trails
+Track marks stamped into decal chunks over the map, fading out over time.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+import pygame
+
+from .assets import ASSETS, SpriteFrames
+from .game_clock import GAME_CLOCK
+from .game_configs import GAME, TANK_DIRECTION, TRAIL
+
+Chunk = Tuple[int, int]
+
+
+class TrailLayer:
+    """Track marks of the tanks around the viewport.
+
+    A tank stamps a mark over the stretch it drove each time it covers one
+    track length, so a tank standing still leaves nothing. Marks go into
+    transparent chunk surfaces layered over the map. Every fade interval
+    one subtracting blit per chunk takes some alpha off all of its marks,
+    so fading and drawing cost depends on the area under trails, never on
+    how many tanks move or for how long. Chunks far off screen are
+    dropped, which bounds memory on big worlds.
+    """
+
+    def __init__(self, chunk_size: int = TRAIL["chunk_size"]) -> None:
+        self.chunk_size = chunk_size
+        self.chunks: Dict[Chunk, pygame.Surface] = {}
+        # game time of the last mark stamped into each chunk
+        self.stamped_at: Dict[Chunk, int] = {}
+        # surfaces of dropped chunks, cleared and reused for new ones
+        self.spare: List[pygame.Surface] = []
+        # world center of each tank when it last stamped a mark
+        self.last_stamps: Dict[object, Tuple[int, int]] = {}
+        # world rects stamped since the last take_stamped_rects()
+        self.stamped_rects: List[pygame.Rect] = []
+
+        # rotated track images and their unrotated size, by tank image
+        self.tracks: Dict[str, Tuple[SpriteFrames, Tuple[int, int]]] = {}
+        max_alpha = 1
+        for tank_asset, (path, scale) in TRAIL["tracks"].items():
+            width, height = ASSETS.get_image(path).get_size()
+            size = (int(width * scale), int(height * scale))
+            self.tracks[tank_asset] = (ASSETS.get_rotations(path, size, TANK_DIRECTION), size)
+            alphas = pygame.image.tobytes(ASSETS.get_image(path, size), "RGBA")[3::4]
+            max_alpha = max(max_alpha, max(alphas))
+        # alpha taken off per step, so the darkest mark is gone after the lifetime
+        steps = max(1, TRAIL["lifetime"] // TRAIL["fade_interval"])
+        self.fade_step = -(-max_alpha // steps)
+        self.last_fade = GAME_CLOCK.get_ticks()
+        # blitted with BLEND_RGBA_SUB, much faster than a fill with the same flag
+        self.fade_surface = self.new_surface()
+        self.fade_amount = 0
+
+        self.stamps = 0
+
+    def get_area(self, viewport: pygame.Rect) -> pygame.Rect:
+        """World area around the viewport where marks are kept."""
+        return viewport.inflate(2 * self.chunk_size, 2 * self.chunk_size).clip(
+            pygame.Rect((0, 0), GAME["world_size"]))
+
+    def new_surface(self) -> pygame.Surface:
+        """Transparent chunk-sized surface."""
+        surface = pygame.Surface((self.chunk_size, self.chunk_size), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        return surface
+
+    def get_chunk(self, chunk: Chunk) -> pygame.Surface:
+        """Surface of a chunk, started empty on first use."""
+        surface = self.chunks.get(chunk)
+        if surface is None:
+            if self.spare:
+                surface = self.spare.pop()
+                surface.fill((0, 0, 0, 0))
+            else:
+                surface = self.new_surface()
+            self.chunks[chunk] = surface
+        return surface
+
+    def stamp(self, img: pygame.Surface, position: Tuple[float, float]) -> None:
+        """Paint a mark at a world position into every chunk it covers."""
+        rect = img.get_rect(topleft=(int(position[0]), int(position[1])))
+        size = self.chunk_size
+        now = GAME_CLOCK.get_ticks()
+        for chunk_y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+            for chunk_x in range(rect.left // size, (rect.right - 1) // size + 1):
+                self.get_chunk((chunk_x, chunk_y)).blit(
+                    img, (rect.x - chunk_x * size, rect.y - chunk_y * size))
+                self.stamped_at[(chunk_x, chunk_y)] = now
+        self.stamped_rects.append(rect)
+        self.stamps += 1
+
+    def update(self, tanks: Iterable, viewport: pygame.Rect) -> bool:
+        """Stamp the marks of the given tanks and fade, return whether marks faded."""
+        # tanks missing from this update start measuring afresh when seen
+        # again, instead of a mark over ground they were never seen on
+        last_stamps = self.last_stamps
+        self.last_stamps = {}
+        for tank in tanks:
+            track = self.tracks.get(tank.asset)
+            if track is None or not tank.is_alive:
+                continue
+            frames, (width, height) = track
+            center = tank.rect.center
+            last = last_stamps.get(tank)
+            if last is None:
+                # start measuring from where the tank is first seen
+                self.last_stamps[tank] = center
+                continue
+            distance = abs(center[0] - last[0]) + abs(center[1] - last[1])
+            if distance < height:
+                self.last_stamps[tank] = last
+                continue
+            self.last_stamps[tank] = center
+            if distance > 2 * height:
+                # moved further than it could drive between two updates
+                continue
+            # cover the stretch driven since the last mark
+            img, (offset_x, offset_y) = frames[tank.direction]
+            self.stamp(img, ((center[0] + last[0]) / 2 - width // 2 + offset_x,
+                             (center[1] + last[1]) / 2 - height // 2 + offset_y))
+
+        area = self.get_area(viewport)
+        size = self.chunk_size
+        for chunk in list(self.chunks):
+            if not area.colliderect((chunk[0] * size, chunk[1] * size, size, size)):
+                self.drop_chunk(chunk)
+        return self.fade()
+
+    def drop_chunk(self, chunk: Chunk) -> None:
+        """Forget a chunk, keeping its surface for reuse."""
+        self.spare.append(self.chunks.pop(chunk))
+        del self.stamped_at[chunk]
+
+    def fade(self) -> bool:
+        """Take alpha off every mark once per fade interval, drop faded out chunks."""
+        now = GAME_CLOCK.get_ticks()
+        steps = (now - self.last_fade) // TRAIL["fade_interval"]
+        if steps <= 0:
+            return False
+        self.last_fade += steps * TRAIL["fade_interval"]
+        # a long stall fades marks by the time that passed, all at once
+        amount = min(255, steps * self.fade_step)
+        if amount != self.fade_amount:
+            self.fade_surface.fill((0, 0, 0, amount))
+            self.fade_amount = amount
+        had_marks = bool(self.chunks)
+        for chunk, surface in list(self.chunks.items()):
+            if now - self.stamped_at[chunk] > TRAIL["lifetime"] + TRAIL["fade_interval"]:
+                # its last mark has faded out
+                self.drop_chunk(chunk)
+            else:
+                surface.blit(self.fade_surface, (0, 0), special_flags=pygame.BLEND_RGBA_SUB)
+        return had_marks
+
+    def take_stamped_rects(self, viewport: pygame.Rect) -> List[pygame.Rect]:
+        """Screen rects of the marks stamped since the last call."""
+        rects = [rect.move(-viewport.left, -viewport.top) for rect in self.stamped_rects]
+        self.stamped_rects = []
+        return rects
+
+    def draw(self, screen: pygame.Surface, viewport: pygame.Rect) -> None:
+        """Blit the chunks with marks inside the viewport."""
+        self.draw_area(screen, viewport, screen.get_rect())
+
+    def draw_area(self, screen: pygame.Surface, viewport: pygame.Rect, rect: pygame.Rect) -> None:
+        """Blit the marks under a screen rect."""
+        if not self.chunks:
+            return
+        size = self.chunk_size
+        world_rect = rect.move(viewport.topleft)
+        for chunk_y in range(world_rect.top // size, (world_rect.bottom - 1) // size + 1):
+            for chunk_x in range(world_rect.left // size, (world_rect.right - 1) // size + 1):
+                surface = self.chunks.get((chunk_x, chunk_y))
+                if surface is None:
+                    continue
+                chunk_left = chunk_x * size - viewport.left
+                chunk_top = chunk_y * size - viewport.top
+                # the part of the chunk under the rect
+                area = rect.clip(pygame.Rect(chunk_left, chunk_top, size, size))
+                screen.blit(surface, area, area=area.move(-chunk_left, -chunk_top))
+
+    def stats(self) -> Dict[str, int]:
+        """Trail counters for monitoring."""
+        return {
+            "trail_chunks": len(self.chunks),
+            "trail_stamps": self.stamps,
+        }
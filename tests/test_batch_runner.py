@@ -0,0 +1,24 @@
+"""
+Batch runner tests.
+"""
+
+from internals.batch_runner import run_batch
+
+
+def test_run_batch_with_spawned_workers():
+    """Spawned workers import the game afresh and still play every match."""
+    report = run_batch({"few_bots": {"bots_count": 2}}, [1, 2], processes=2, start_method="spawn")
+    matches = report["matches"]["few_bots"]
+    assert [match["seed"] for match in matches] == [1, 2]
+    assert all(match["ticks"] > 0 for match in matches)
+    assert report["configs"]["few_bots"]["matches"] == 2
+
+
+def test_run_batch_matches_play_the_same_in_one_process():
+    """A match plays out the same in spawned workers and in the calling process."""
+    configs = {"few_bots": {"bots_count": 2}}
+    pooled = run_batch(configs, [3, 4], processes=2, start_method="spawn")
+    local = run_batch(configs, [3, 4], processes=1)
+    for key in ["ticks", "time_to_win", "tank_collisions", "bullet_hits"]:
+        assert ([match[key] for match in pooled["matches"]["few_bots"]]
+                == [match[key] for match in local["matches"]["few_bots"]])
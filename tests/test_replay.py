@@ -0,0 +1,27 @@
+"""
+Replay tests.
+"""
+
+import pytest
+
+import game
+from internals.replay import Replay
+
+
+def test_seed_out_of_the_header_range_is_rejected():
+    """A seed the replay header cannot store fails before the match is played."""
+    with pytest.raises(SystemExit):
+        game.parser.parse_args(["--seed", "-1", "--record", "out.rpl"])
+    with pytest.raises(SystemExit):
+        game.parser.parse_args(["--seed", str(game.MAX_SEED + 1)])
+
+
+def test_largest_seed_survives_a_save(tmp_path):
+    """The largest accepted seed is saved and loaded unchanged."""
+    seed = game.parser.parse_args(["--seed", str(game.MAX_SEED)]).seed
+    replay = Replay(seed, runs=[(0, 3), (16, 2)], state_hash="00" * 8)
+    path = str(tmp_path / "out.rpl")
+    replay.save(path)
+    loaded = Replay.load(path)
+    assert loaded.seed == seed
+    assert loaded.runs == replay.runs